@@ -16,20 +16,523 @@ DIMENSION LIMITATIONS:
 """
 
 import os
-import json
+import sys
+import queue
+import atexit
 import asyncio
-from typing import Dict, List, Any, Optional
+import logging
+import base64
+import hashlib
+import shutil
+import struct
+import time
+import importlib.util
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import ClassVar, Dict, List, Any, Mapping, Optional, Set, Tuple
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
+import aiofiles
+import httpx
+import orjson
 from openai import AsyncOpenAI
 
 from config import Config
 
+logger = logging.getLogger(__name__)
+_log_listener: Optional[QueueListener] = None
+
+
+def _start_log_listener():
+    """Queue status lines to a console listener thread, so concurrent variation tasks
+    never block on stdout; skipped when the host application has configured logging"""
+    global _log_listener
+    if _log_listener is not None or logger.handlers or logging.getLogger().handlers:
+        return
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter("%(message)s"))
+    _log_listener = QueueListener(log_queue, console_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(QueueHandler(log_queue))
+
+
+# One pooled HTTP transport shared by every generator's OpenAI client, so the
+# parallel variation calls reuse keep-alive (and HTTP/2 when h2 is installed)
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_shared_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it if missing or closed"""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=_HTTP_LIMITS,
+            timeout=_HTTP_TIMEOUT
+        )
+    return _shared_http_client
+
+
+
+class _RateLimiter:
+    """Sliding-window requests-per-minute limiter; a non-positive rpm disables it"""
+
+    def __init__(self, rpm: int, window: float = 60.0):
+        self._rpm = rpm
+        self._window = window
+        self._stamps: deque = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until another request fits in the current window, then record it"""
+        if self._rpm <= 0:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                while self._stamps and now - self._stamps[0] >= self._window:
+                    self._stamps.popleft()
+                if len(self._stamps) < self._rpm:
+                    self._stamps.append(now)
+                    return
+                await asyncio.sleep(self._window - (now - self._stamps[0]))
+
+# GPT-Image-1 output sizes with their aspect ratios
+_GPT_IMAGE_SIZES: Tuple[Tuple[str, float], ...] = (
+    ("1536x1024", 1.5),    # Landscape 3:2 - BEST for desktop
+    ("1024x1024", 1.0),    # Square
+    ("1024x1536", 0.667),  # Portrait 2:3 - mobile-like
+)
+
+# Where to look for the original screenshot when the component map has none
+_SCREENSHOT_FALLBACKS = (
+    "outputs/screenshots/www.agentops.ai_.png",
+    "outputs/screenshots/segment_1_top.png",
+    "segment_1_top.png",
+    "outputs/screenshots/segment_2_quarter.png",
+    "segment_2_quarter.png"
+)
+
+# Every PNG starts with this signature, followed by the IHDR chunk holding width/height
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Base64 characters decoded per write when saving generated images (48 KiB of PNG)
+_B64_CHUNK = 64 * 1024
+
+# Content-addressed store of generated images, keyed by prompt hash (CACHE_IMAGES)
+IMAGE_CACHE_DIR = "outputs/variations/.cache"
+
+# Chat completion responses from earlier runs, keyed by a hash of the full request
+RESPONSE_CACHE_DIR = "outputs/.response_cache"
+
+# Static per-pattern expectations and testing guidance (read-only, shared across runs)
+_EXPECTED_IMPROVEMENTS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "1": (
+        "Higher conversion rates from clear CTA",
+        "Reduced bounce rate from focused messaging",
+        "Better mobile experience"
+    ),
+    "2": (
+        "Increased feature discovery",
+        "Higher engagement with multiple CTAs",
+        "Better for complex products"
+    ),
+    "3": (
+        "Improved user education",
+        "Higher qualified leads",
+        "Better for B2B conversions"
+    ),
+    "4": (
+        "Urgency-driven conversions",
+        "Social proof validation",
+        "Reduced decision friction"
+    )
+})
+
+# Per-pattern layout instructions and element positioning for the image modification prompt
+_PATTERN_PROMPT_FRAGMENTS: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    "1": MappingProxyType({
+        "layout": """
+            CRITICAL: CREATE A DRAMATIC TWO-COLUMN LAYOUT TRANSFORMATION:
+            
+            LEFT COLUMN (50% width):
+            - Move ALL hero text content to the LEFT side of the screen
+            - Stack the headline, subheadline, and description vertically on the left
+            - Place call-to-action buttons below the text on the left side
+            - Add company logos/social proof at the bottom of left column
+            - Left-align all text content (not centered)
+            
+            RIGHT COLUMN (50% width):
+            - Create a large demo/dashboard mockup image on the RIGHT side
+            - Show a product interface, dashboard, or application screenshot
+            - Make this visual element take up the entire right half
+            - Add subtle shadows or modern styling to the demo image
+            
+            LAYOUT TRANSFORMATION:
+            - Split the hero section into two equal columns (50/50)
+            - Remove the centered layout completely
+            - Create clear visual separation between left text and right image
+            - Ensure the demo image is prominent and engaging
+            - Make the layout feel like a modern SaaS landing page
+            """,
+        "hero": "Two-column split layout: Left side text content, Right side demo/dashboard image",
+        "navigation": "Minimal, clean navigation with essential items only",
+        "cta": "Primary CTA button positioned in left column below the headline text",
+        "content": "Hero content split into left text column and right demo image, company logos below"
+    }),
+    "2": MappingProxyType({
+        "layout": """
+            - Create a 3-column grid layout for main features
+            - Add multiple call-to-action buttons (one per feature)
+            - Make feature cards more prominent with icons or images
+            - Distribute content more evenly across the page
+            - Add hover effects and interactive elements
+            - Include multiple entry points for different user types
+            """,
+        "hero": "Moderate size with grid elements below",
+        "navigation": "Standard navigation with multiple entry points",
+        "cta": "Multiple CTAs distributed across feature sections",
+        "content": "Grid-based content with equal visual weight"
+    }),
+    "3": MappingProxyType({
+        "layout": """
+            - Add more detailed descriptions and explanations
+            - Include an FAQ section or detailed product information
+            - Add testimonials, case studies, or social proof
+            - Create expandable sections for additional information
+            - Include comparison tables or feature lists
+            - Add educational content or how-it-works sections
+            """,
+        "hero": "Smaller hero with more content sections",
+        "navigation": "Detailed navigation with more menu items",
+        "cta": "CTAs placed after detailed explanations",
+        "content": "Rich, detailed content with multiple sections"
+    }),
+    "4": MappingProxyType({
+        "layout": """
+            - Add urgency indicators (limited time offers, countdown timers)
+            - Include social proof badges (customer count, ratings)
+            - Add trust signals (security badges, certifications)
+            - Create scarcity elements (limited availability)
+            - Include customer testimonials prominently
+            - Add risk-reduction elements (money-back guarantee, free trial)
+            """,
+        "hero": "Prominent with urgency elements and social proof",
+        "navigation": "Navigation with trust signals and contact info",
+        "cta": "Prominent CTAs with urgency and social proof",
+        "content": "Content focused on conversion with social proof"
+    })
+})
+
+_COMPARISON_METRICS: Mapping[str, Any] = MappingProxyType({
+    "suggested_metrics": (
+        "Conversion rate",
+        "Click-through rate",
+        "Bounce rate",
+        "Time on page",
+        "Scroll depth"
+    ),
+    "testing_duration": "2-4 weeks",
+    "minimum_sample_size": "1000 visitors per variation",
+    "statistical_significance": "95% confidence level"
+})
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize the read-only mapping views used for shared constants"""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# Sorted keys keep equal content byte-identical; component maps may carry int keys
+_JSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(obj: Any) -> str:
+    """Compact, key-sorted JSON for prompt payloads; equal content always yields the same prompt"""
+    return orjson.dumps(obj, default=_json_default, option=_JSON_OPTIONS).decode()
+
+
+def _prune_cache_dir(path: str, ttl_seconds: float, max_entries: int):
+    """Delete cache entries older than the TTL, then the oldest ones over the cap"""
+    try:
+        entries = [entry for entry in os.scandir(path) if entry.is_file() and not entry.name.endswith(".tmp")]
+    except FileNotFoundError:
+        return
+    cutoff = time.time() - ttl_seconds
+    newest_first = sorted(((entry.stat().st_mtime, entry.path) for entry in entries), reverse=True)
+    for index, (mtime, entry_path) in enumerate(newest_first):
+        if mtime < cutoff or index >= max_entries:
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+
+
+def _content_hash(obj: Any) -> str:
+    """Stable content hash; sorted keys make it independent of dict insertion order"""
+    return hashlib.sha1(orjson.dumps(obj, option=_JSON_OPTIONS)).hexdigest()
+
+
+def _compact_hierarchy(hierarchy: Any, max_nodes: int = 80) -> Any:
+    """
+    Breadth-first copy of a component hierarchy keeping at most max_nodes nested containers
+
+    Containers beyond the budget are replaced with a short note of how many entries
+    were omitted, so the prompt keeps the top of the tree at a bounded size.
+    """
+    if not isinstance(hierarchy, (dict, list)):
+        return hierarchy
+
+    remaining = max_nodes
+    compact = {} if isinstance(hierarchy, dict) else []
+    queue = deque([(hierarchy, compact)])
+
+    while queue:
+        source, target = queue.popleft()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                if remaining <= 0:
+                    value = f"... {len(value)} nested entries omitted"
+                else:
+                    remaining -= 1
+                    child = {} if isinstance(value, dict) else []
+                    queue.append((value, child))
+                    value = child
+            if isinstance(target, dict):
+                target[key] = value
+            else:
+                target.append(value)
+
+    return compact
+
+
+@dataclass(frozen=True, slots=True)
+class ABPattern:
+    """Immutable A/B testing pattern with prompt fragments precomputed"""
+    id: str
+    name: str
+    description: str
+    layout_strategy: str
+    key_changes: Tuple[str, ...]
+    key_changes_bullets: str
+
+    @classmethod
+    def from_dict(cls, pattern_id: str, raw: Dict[str, Any]) -> "ABPattern":
+        """Build a pattern from its raw definition"""
+        key_changes = tuple(raw["key_changes"])
+        return cls(
+            id=pattern_id,
+            name=raw["name"],
+            description=raw["description"],
+            layout_strategy=raw["layout_strategy"],
+            key_changes=key_changes,
+            key_changes_bullets="\n".join(f"• {change}" for change in key_changes)
+        )
+
+
+def _modification_record(pattern: ABPattern, payload: Any) -> Dict[str, Any]:
+    """
+    Build a variation's modified_components from the model's modification payload
+
+    The short summary is what the React prompt sees; the full structure is kept for the
+    package. The original hierarchy is referenced rather than copied per variation.
+    """
+    summary = None
+    structure = payload
+    if isinstance(payload, dict) and "full_structure" in payload:
+        summary = payload.get("summary")
+        structure = payload["full_structure"]
+    if isinstance(summary, (dict, list)):
+        summary = _dumps(summary)
+    return {
+        "original_components_ref": "$.original_analysis.component_hierarchy",
+        "modification_strategy": pattern.layout_strategy,
+        "summary": summary,
+        "modified_structure": structure if isinstance(structure, str) else _dumps(structure)
+    }
+
+
+def _build_selection_menu(patterns: Dict[str, ABPattern]) -> str:
+    """Build the interactive A/B pattern selection menu"""
+    lines = ["\n🎯 Select A/B Testing Pattern:", "=" * 50]
+    for key, pattern in patterns.items():
+        lines.append(f"{key}. {pattern.name}")
+        lines.append(f"   {pattern.description}")
+        lines.append(f"   Changes: {', '.join(pattern.key_changes[:2])}...")
+        lines.append("")
+    lines.append("5. Generate ALL variations (recommended)")
+    lines.append("=" * 50)
+    return "\n".join(lines)
+
+
+def _build_modification_system_prompt(patterns: Dict[str, ABPattern]) -> str:
+    """
+    Build the shared system prompt for component modification
+
+    The rubric and the full pattern catalogue are identical for every request, so they
+    lead the prompt; only the hierarchy and the selected pattern ids follow in the user
+    message. That keeps a long common prefix for OpenAI's automatic prompt caching.
+    """
+    catalogue = "\n\n".join(
+        f"""Pattern "{pattern.id}": {pattern.name}
+Strategy: {pattern.layout_strategy}
+Key Changes:
+{pattern.key_changes_bullets}"""
+        for pattern in patterns.values()
+    )
+    return f"""You are a UX expert specializing in A/B testing and conversion optimization. Modify component structures to match specific testing patterns.
+
+For each requested pattern, provide a modified component structure that implements its changes:
+1. Rearrange component priority and positioning
+2. Modify component sizes and emphasis
+3. Add/remove elements based on pattern
+4. Adjust content hierarchy
+5. Optimize for the pattern's goals
+
+Each pattern's result is an object with two fields:
+- "summary": a compact outline of the new arrangement (section order, primary CTA, emphasis changes), at most 150 words
+- "full_structure": the complete new component arrangement
+
+A/B Testing Patterns:
+
+{catalogue}"""
+
+
+# Static React instructions lead the prompt so every variation shares the prefix
+_REACT_SYSTEM_PROMPT = """You are an expert React developer specializing in A/B testing implementations. Generate conversion-optimized React components.
+
+For each A/B testing variation you are given:
+1. Implement the A/B testing pattern exactly
+2. Use modern React with TypeScript
+3. Include Tailwind CSS for styling
+4. Make it responsive and accessible
+5. Add proper conversion tracking hooks
+6. Include A/B testing metadata
+7. Optimize for the pattern's goals
+
+Generate complete, production-ready code that implements the variation."""
+
+
+def _build_text_only_prompt(pattern: ABPattern) -> str:
+    """Build the text-only fallback image prompt for a pattern"""
+    return f"""
+        Create a modern website landing page design for A/B testing:
+        
+        PATTERN: {pattern.name} - {pattern.description}
+        
+        LAYOUT REQUIREMENTS:
+        {pattern.key_changes_bullets}
+        
+        DESIGN SPECIFICATIONS:
+        - Professional business website aesthetic
+        - Modern, clean design with good conversion potential
+        - Clear visual hierarchy and user flow
+        - Responsive design principles
+        - High-converting landing page layout
+        
+        STYLE: Clean, modern, professional website design, flat design, minimal shadows, contemporary UI/UX, optimized for conversions
+        """
+
+
+# Pattern-independent part of every screenshot edit prompt; it leads so all variations
+# send an identical prefix
+_IMAGE_MODIFICATION_PREAMBLE = """
+        LAYOUT REARRANGEMENT TASK: Transform the hero section from centered to two-column layout while preserving ALL original design elements.
+        
+        LAYOUT TRANSFORMATION (PRESERVE ALL STYLING):
+        - SPLIT the hero section into left text column (50%) and right demo image (50%)
+        - MOVE the headline "Trace, Debug, & Deploy Reliable AI Agents" to LEFT side
+        - MOVE the description text to LEFT side below headline
+        - MOVE the CTA button to LEFT side below description
+        - ADD a dashboard/interface mockup on RIGHT side showing AgentOps platform
+        - KEEP all colors, fonts, styling, and branding identical to original
+        
+        CRITICAL DESIGN PRESERVATION:
+        - Use EXACT same purple/blue color scheme from original
+        - Use EXACT same fonts and typography from original
+        - Use EXACT same button styling and colors from original
+        - Keep EXACT same background colors and overall aesthetic
+        - Preserve the AgentOps logo and navigation exactly as shown
+        - Maintain the same professional, clean visual style
+        
+        RESULT: Should look like the same AgentOps website with hero content rearranged into two columns - identical styling, just different layout positioning.
+        """
+
+
+def _build_image_modification_prompt(pattern: ABPattern) -> str:
+    """Build the GPT-Image-1 screenshot modification prompt for a pattern"""
+    fragments = _PATTERN_PROMPT_FRAGMENTS.get(pattern.id, _PATTERN_PROMPT_FRAGMENTS["1"])
+    return _IMAGE_MODIFICATION_PREAMBLE + f"""
+        TRANSFORMATION GOAL: {pattern.name} - {pattern.layout_strategy}
+        
+        MANDATORY LAYOUT CHANGES (POSITIONING ONLY):
+        {pattern.key_changes_bullets}
+        
+        SPECIFIC REARRANGEMENT INSTRUCTIONS:
+        {fragments["layout"]}
+        
+        EXACT POSITIONING REQUIREMENTS:
+        - Hero Section: {fragments["hero"]}
+        - Navigation: {fragments["navigation"]}
+        - Call-to-Action: {fragments["cta"]}
+        - Content Layout: {fragments["content"]}
+        """
+
+
+@lru_cache(maxsize=64)
+def _probe_image_size(path: str, mtime_ns: int, size: int) -> Tuple[int, int]:
+    """Read an image's (width, height); mtime and size in the key invalidate rewritten files"""
+    # PNG stores its size in the IHDR chunk right after the signature; no need for PIL
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] == _PNG_SIGNATURE and header[12:16] == b"IHDR":
+        return struct.unpack(">II", header[16:24])
+
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+
+# Design-preservation wrapper around every screenshot edit prompt
+_DESIGN_PRESERVATION_TEMPLATE = """
+        LAYOUT REARRANGEMENT ONLY, NOT A REDESIGN. Keep these EXACTLY as in the original:
+        1. Colors: backgrounds, text, buttons, brand palette and gradients
+        2. Typography: font families, weights, sizes and hierarchy
+        3. Visual style: shadows, borders, spacing, padding and effects
+        4. The AgentOps logo, navigation and brand identity
+        Only move existing elements to new positions. Do not crop important content.
+
+        SIZE: the original is a {width}x{height} desktop page; output is landscape 1536x1024,
+        so focus the transformation on the hero section and top of the page.
+
+        {modification_prompt}
+        """
+
+
+@lru_cache(maxsize=128)
+def _render_design_instructions(width: int, height: int, modification_prompt: str) -> str:
+    """Wrap an edit prompt in the design-preservation instructions for a screenshot size"""
+    return _DESIGN_PRESERVATION_TEMPLATE.format(
+        width=width, height=height, modification_prompt=modification_prompt)
+
 
 class ABTestGenerator:
     """Generates A/B testing variations from component maps"""
 
     # 4 Most Common A/B Testing Patterns
-    AB_TEST_PATTERNS = {
+    _RAW_AB_TEST_PATTERNS = {
         "1": {
             "name": "Hero-First Layout",
             "description": "Prominent hero section with clear CTA, minimal navigation",
@@ -76,14 +579,68 @@ class ABTestGenerator:
         }
     }
 
+    AB_TEST_PATTERNS: Dict[str, ABPattern] = {
+        pattern_id: ABPattern.from_dict(pattern_id, raw)
+        for pattern_id, raw in _RAW_AB_TEST_PATTERNS.items()
+    }
+
+    # Interactive selection menu and accepted choices
+    SELECTION_MENU = _build_selection_menu(AB_TEST_PATTERNS)
+    VALID_CHOICES = frozenset({"1", "2", "3", "4", "5"})
+
+    # Component modification rubric and pattern catalogue shared by every request
+    MODIFICATION_SYSTEM_PROMPT = _build_modification_system_prompt(AB_TEST_PATTERNS)
+
+    # Per-variation outputs generate_ab_variations can produce; React code needs the components
+    VARIATION_OUTPUTS = frozenset({"components", "react", "image"})
+
+    # Output directories already created by this process
+    _ensured_dirs: ClassVar[Set[str]] = set()
+
+    # Text-only fallback prompts only depend on the pattern, so build them once
+    TEXT_ONLY_PROMPTS = {
+        pattern_id: _build_text_only_prompt(pattern)
+        for pattern_id, pattern in AB_TEST_PATTERNS.items()
+    }
+
+    # The screenshot modification prompt only depends on the pattern as well
+    IMAGE_MODIFICATION_PROMPTS = {
+        pattern_id: _build_image_modification_prompt(pattern)
+        for pattern_id, pattern in AB_TEST_PATTERNS.items()
+    }
+
     def __init__(self):
+        _start_log_listener()
         self.config = Config()
-        self.client = AsyncOpenAI(api_key=self.config.OPENAI_API_KEY)
+        self._client: Optional[AsyncOpenAI] = None
+
+        # Bound in-flight OpenAI requests so parallel variations don't trip rate limits
+        self._sem = asyncio.Semaphore(self.config.OPENAI_CONCURRENCY)
+        # Image calls run for tens of seconds; a smaller cap keeps them from holding every slot
+        self._img_sem = asyncio.Semaphore(self.config.OPENAI_IMAGE_CONCURRENCY)
+        # Pace request starts to the account's rate limits instead of bouncing off 429s
+        self._limiter = _RateLimiter(self.config.OPENAI_RPM)
+        self._img_limiter = _RateLimiter(self.config.OPENAI_IMAGE_RPM)
+
+        # LLM results keyed by (prompt input, pattern id) so repeat runs skip the round trip;
+        # modifications key on the serialized hierarchy, React code on a content hash
+        self._mod_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._react_cache: Dict[Tuple[str, str], str] = {}
+
+        # Screenshot upload bytes keyed by (path, mtime); concurrent variations share one read
+        self._upload_cache: Dict[Tuple[str, int], "asyncio.Task[bytes]"] = {}
+
+        # Screenshot dimensions and output size keyed by (path, mtime)
+        self._geometry_cache: Dict[Tuple[str, int], Tuple[int, int, str]] = {}
+
+        # Run timestamp shared by every file and record produced in one run
+        self._start_run()
 
     async def generate_ab_variations(
         self,
         component_map: Dict[str, Any],
-        selected_pattern: Optional[str] = None
+        selected_pattern: Optional[str] = None,
+        include: Optional[Set[str]] = None
     ) -> Dict[str, Any]:
         """
         Generate A/B testing variations from component map
@@ -91,28 +648,57 @@ class ABTestGenerator:
         Args:
             component_map: The component analysis and React code
             selected_pattern: Optional specific pattern (1-4), if None generates all
+            include: Outputs to generate per variation ("components", "react", "image");
+                defaults to all of them. Skipped outputs are omitted from the package.
 
         Returns:
             Complete A/B testing variations with images and prompts
         """
-        print("🧪 Starting A/B test variation generation...")
+        logger.info("🧪 Starting A/B test variation generation...")
+        self._start_run()
+
+        include = self.VARIATION_OUTPUTS if include is None else frozenset(include)
+        if "react" in include:
+            include |= {"components"}
+
+        # Done once here rather than per image; the cache dir creates outputs/variations too
+        self._ensure_dir(IMAGE_CACHE_DIR if self.config.CACHE_IMAGES else "outputs/variations")
+        if self.config.CACHE_CHAT_RESPONSES:
+            self._ensure_dir(RESPONSE_CACHE_DIR)
+
+        # Keep the on-disk caches bounded by age and entry count
+        cache_dirs = [
+            cache_dir for cache_dir, enabled in (
+                (IMAGE_CACHE_DIR, self.config.CACHE_IMAGES),
+                (RESPONSE_CACHE_DIR, self.config.CACHE_CHAT_RESPONSES)
+            ) if enabled
+        ]
+        for cache_dir in cache_dirs:
+            await asyncio.to_thread(
+                _prune_cache_dir, cache_dir,
+                self.config.CACHE_TTL_HOURS * 3600, self.config.CACHE_MAX_ENTRIES)
 
         # If no pattern selected, ask user
         if not selected_pattern:
-            selected_pattern = self._get_user_selection()
+            selected_pattern = await self._get_user_selection()
+
+        # Serialize the (compacted) hierarchy once; every modification prompt embeds it
+        hierarchy_json = _dumps(_compact_hierarchy(component_map['component_hierarchy']))
 
         # Generate variations based on selected pattern(s)
         if selected_pattern == "all":
-            variations = await self._generate_all_variations(component_map)
+            variations = await self._generate_all_variations(component_map, hierarchy_json, include)
         else:
-            variations = await self._generate_single_variation(component_map, selected_pattern)
+            variations = await self._generate_single_variation(
+                component_map, selected_pattern, hierarchy_json, include)
 
         # Create final A/B test package
         ab_test_package = {
             "metadata": {
                 "original_url": component_map["metadata"]["url"],
-                "generation_timestamp": datetime.now().isoformat(),
+                "generation_timestamp": self._run_iso,
                 "selected_pattern": selected_pattern,
+                "included_outputs": sorted(include),
                 "total_variations": len(variations)
             },
             "original_analysis": component_map,
@@ -120,79 +706,237 @@ class ABTestGenerator:
             "comparison_metrics": self._generate_comparison_metrics(variations)
         }
 
-        print(f"✅ Generated {len(variations)} A/B test variations!")
+        logger.info(f"✅ Generated {len(variations)} A/B test variations!")
         return ab_test_package
 
-    def _get_user_selection(self) -> str:
+    @property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client on the shared HTTP transport, rebuilt after aclose()"""
+        if self._client is None or self._client.is_closed():
+            # The SDK retries 429/5xx responses with exponential backoff and honours retry-after
+            self._client = AsyncOpenAI(
+                api_key=self.config.OPENAI_API_KEY,
+                max_retries=self.config.OPENAI_MAX_RETRIES,
+                http_client=_get_shared_http_client()
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.close()
+
+    @classmethod
+    def _ensure_dir(cls, path: str):
+        """Create a directory the first time this process needs it"""
+        if path not in cls._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            cls._ensured_dirs.add(path)
+
+    def _start_run(self):
+        """Capture the run timestamp once, in ISO and filename-tag form, and reset per-run lookups"""
+        run_ts = datetime.now()
+        self._run_iso = run_ts.isoformat()
+        self._run_tag = run_ts.strftime("%Y%m%d_%H%M%S")
+
+        # Original screenshot lookup keyed by the segment screenshot paths it checks;
+        # reset each run so files created or removed since the last run are seen
+        self._screenshot_path_cache: Dict[Tuple[Optional[str], ...], Optional[str]] = {}
+
+    async def _get_user_selection(self) -> str:
         """Interactive user selection for A/B test patterns"""
-        print("\n🎯 Select A/B Testing Pattern:")
-        print("=" * 50)
-
-        for key, pattern in self.AB_TEST_PATTERNS.items():
-            print(f"{key}. {pattern['name']}")
-            print(f"   {pattern['description']}")
-            print(f"   Changes: {', '.join(pattern['key_changes'][:2])}...")
-            print()
-
-        print("5. Generate ALL variations (recommended)")
-        print("=" * 50)
+        print(self.SELECTION_MENU)
 
         while True:
-            choice = input("Enter your choice (1-5): ").strip()
-            if choice in ["1", "2", "3", "4"]:
-                return choice
+            # Read input in a worker thread so the event loop is not blocked
+            choice = (await asyncio.to_thread(input, "Enter your choice (1-5): ")).strip()
+            if choice not in self.VALID_CHOICES:
+                print("❌ Invalid choice. Please enter 1, 2, 3, 4, or 5.")
             elif choice == "5":
                 return "all"
             else:
-                print("❌ Invalid choice. Please enter 1, 2, 3, 4, or 5.")
+                return choice
 
-    async def _generate_all_variations(self, component_map: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_all_variations(self, component_map: Dict[str, Any], hierarchy_json: str, include: Set[str]) -> Dict[str, Any]:
         """Generate all 4 A/B testing variations"""
-        variations = {}
+        completed = {}
+
+        # One shared request covers every pattern's component modification; image
+        # generation doesn't depend on it, so the variations start without waiting
+        modifications_ready = None
+        if "components" in include:
+            modifications_ready = asyncio.create_task(
+                self._modify_components_batch(
+                    hierarchy_json, list(self.AB_TEST_PATTERNS.values())),
+                name="modify-batch"
+            )
 
         # Generate all patterns in parallel
-        tasks = []
-        for pattern_id in self.AB_TEST_PATTERNS.keys():
-            task = self._create_variation(component_map, pattern_id)
-            tasks.append((pattern_id, task))
-
-        # Execute all tasks
-        for pattern_id, task in tasks:
-            try:
-                variation = await task
-                variations[f"variation_{pattern_id}"] = variation
-                print(
-                    f"  ✅ Generated variation {pattern_id}: {variation['name']}")
-            except Exception as e:
-                print(f"  ❌ Failed to generate variation {pattern_id}: {e}")
+        tasks = {
+            asyncio.create_task(
+                self._create_variation(
+                    component_map, pattern_id, hierarchy_json, include, modifications_ready),
+                name=f"var-{pattern_id}"
+            ): pattern_id
+            for pattern_id in self.AB_TEST_PATTERNS
+        }
 
-        return variations
+        # Report variations as they finish; one failure doesn't block its siblings
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pattern_id = tasks[task]
+                    if task.exception() is not None:
+                        logger.error(
+                            f"  ❌ Failed to generate variation {pattern_id}: {task.exception()}")
+                    else:
+                        completed[pattern_id] = task.result()
+                        logger.info(
+                            f"  ✅ Generated variation {pattern_id}: {completed[pattern_id]['name']}")
+        finally:
+            # Propagate cancellation of the caller to the in-flight variations
+            for task in pending:
+                task.cancel()
+            if modifications_ready is not None:
+                modifications_ready.cancel()
+
+        # Keep the package in pattern order regardless of completion order
+        return {
+            f"variation_{pattern_id}": completed[pattern_id]
+            for pattern_id in self.AB_TEST_PATTERNS
+            if pattern_id in completed
+        }
 
-    async def _generate_single_variation(self, component_map: Dict[str, Any], pattern_id: str) -> Dict[str, Any]:
+    async def _generate_single_variation(self, component_map: Dict[str, Any], pattern_id: str, hierarchy_json: str, include: Set[str]) -> Dict[str, Any]:
         """Generate a single A/B testing variation"""
-        variation = await self._create_variation(component_map, pattern_id)
+        variation = await self._create_variation(component_map, pattern_id, hierarchy_json, include)
         return {f"variation_{pattern_id}": variation}
 
-    async def _create_variation(self, component_map: Dict[str, Any], pattern_id: str) -> Dict[str, Any]:
+    async def _create_variation(
+        self,
+        component_map: Dict[str, Any],
+        pattern_id: str,
+        hierarchy_json: str,
+        include: Set[str] = VARIATION_OUTPUTS,
+        modifications_ready: Optional["asyncio.Task[None]"] = None
+    ) -> Dict[str, Any]:
         """Create a single A/B testing variation"""
         pattern = self.AB_TEST_PATTERNS[pattern_id]
 
-        print(f"  🔄 Creating {pattern['name']} variation...")
+        logger.info(f"  🔄 Creating {pattern.name} variation...")
+
+        # The image prompt depends only on the pattern, so the image branch (generate, check,
+        # regenerate) runs alongside the modification -> React code chain from the start
+        image_prompt = self._create_image_modification_prompt(pattern)
+
+        async def _components_and_code():
+            if "components" not in include:
+                return None, None
+            if modifications_ready is not None:
+                # Wait for the batched modification to fill the cache (shared with siblings)
+                await asyncio.shield(modifications_ready)
+            modified = await self._modify_components(hierarchy_json, pattern)
+            if "react" not in include:
+                return modified, None
+            return modified, await self._generate_variation_react_code(modified, pattern)
+
+        async def _image():
+            if "image" not in include:
+                return None
+            return await self._generate_checked_image(component_map, image_prompt, pattern)
+
+        (modified_components, variation_react_code), final_image = await asyncio.gather(
+            _components_and_code(),
+            _image()
+        )
 
-        # Step 1: Generate modified component structure
-        modified_components = await self._modify_components(component_map, pattern)
+        # Create variation package
+        variation = {
+            "id": pattern_id,
+            "name": pattern.name,
+            "description": pattern.description,
+            "layout_strategy": pattern.layout_strategy,
+            "key_changes": pattern.key_changes,
+            "modified_components": modified_components,
+            "react_code": variation_react_code,
+            "image_prompt": image_prompt,
+            "generated_image": final_image,
+            "expected_improvements": self._get_expected_improvements(pattern_id)
+        }
 
-        # Step 2: Generate new React code for the variation
-        variation_react_code = await self._generate_variation_react_code(modified_components, pattern)
+        # Outputs left out of `include` are omitted rather than stored as null
+        return {key: value for key, value in variation.items() if value is not None}
+
+    @asynccontextmanager
+    async def _api_slot(self, image: bool = False):
+        """Hold a concurrency slot for one OpenAI request, paced to the configured RPM"""
+        if image:
+            await self._img_limiter.acquire()
+            async with self._img_sem, self._sem:
+                await self._limiter.acquire()
+                yield
+        else:
+            async with self._sem:
+                await self._limiter.acquire()
+                yield
+
+    async def _chat_completion(self, messages: List[Dict[str, Any]], **kwargs) -> str:
+        """Run a chat completion on the configured chat model, reusing responses from earlier runs"""
+        if not self.config.CACHE_CHAT_RESPONSES:
+            return await self._request_chat_completion(messages, **kwargs)
+
+        # The model, messages and sampling options fully determine the request, so a prompt
+        # edit invalidates its entries without any explicit versioning
+        cache_key = hashlib.blake2b(
+            orjson.dumps([self.config.OPENAI_CHAT_MODEL, messages, kwargs], option=_JSON_OPTIONS),
+            digest_size=16
+        ).hexdigest()
+        cached_path = os.path.join(RESPONSE_CACHE_DIR, f"{cache_key}.txt")
+        if os.path.isfile(cached_path):
+            async with aiofiles.open(cached_path, 'r', encoding='utf-8') as f:
+                return await f.read()
+
+        content = await self._request_chat_completion(messages, **kwargs)
+        if content:
+            # Write then rename so an interrupted run never leaves a truncated entry
+            tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+            async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+                await f.write(content)
+            os.replace(tmp_path, cached_path)
+        return content
+
+    async def _request_chat_completion(self, messages: List[Dict[str, Any]], **kwargs) -> str:
+        """Send a chat completion request and return the message text"""
+        async with self._api_slot():
+            if not self.config.OPENAI_CHAT_STREAM:
+                response = await self.client.chat.completions.create(
+                    model=self.config.OPENAI_CHAT_MODEL,
+                    messages=messages,
+                    **kwargs
+                )
+                return response.choices[0].message.content
 
-        # Step 3: Create image modification prompt for GPT-Image-1
-        image_prompt = self._create_image_modification_prompt(
-            component_map, pattern, modified_components)
+            # Streaming: accumulate deltas as they arrive
+            stream = await self.client.chat.completions.create(
+                model=self.config.OPENAI_CHAT_MODEL,
+                messages=messages,
+                stream=True,
+                **kwargs
+            )
+            pieces = []
+            async for chunk in stream:
+                if chunk.choices:
+                    pieces.append(chunk.choices[0].delta.content or "")
+            return "".join(pieces)
 
-        # Step 4: Generate variation image using original screenshot + modifications
-        variation_image = await self._generate_variation_image_with_screenshot(component_map, image_prompt, pattern)
+    async def _generate_checked_image(self, component_map: Dict[str, Any], image_prompt: str, pattern: ABPattern) -> Dict[str, Any]:
+        """Generate the variation image, then quality check and potentially regenerate it"""
+        variation_image = await self._generate_variation_image_with_screenshot(
+            component_map, image_prompt, pattern)
 
-        # Step 5: Quality check and potentially regenerate if needed
         final_image = variation_image
         if variation_image.get('local_path') and not variation_image.get('error'):
             quality_check = await self._quality_check_image(variation_image['local_path'])
@@ -210,56 +954,30 @@ class ABTestGenerator:
                 # Use improved image if successful
                 if improved_image.get('local_path') and not improved_image.get('error'):
                     final_image = improved_image
-                    print(
-                        f"    ✨ Using quality-improved image for {pattern['name']}")
+                    logger.info(
+                        f"    ✨ Using quality-improved image for {pattern.name}")
 
             # Add quality check results to image metadata
             final_image['quality_check'] = quality_check
 
-        # Step 6: Create variation package
-        variation = {
-            "id": pattern_id,
-            "name": pattern["name"],
-            "description": pattern["description"],
-            "layout_strategy": pattern["layout_strategy"],
-            "key_changes": pattern["key_changes"],
-            "modified_components": modified_components,
-            "react_code": variation_react_code,
-            "image_prompt": image_prompt,
-            "generated_image": final_image,
-            "expected_improvements": self._get_expected_improvements(pattern_id)
-        }
-
-        return variation
+        return final_image
 
-    async def _modify_components(self, component_map: Dict[str, Any], pattern: Dict[str, Any]) -> Dict[str, Any]:
+    async def _modify_components(self, hierarchy_json: str, pattern: ABPattern) -> Dict[str, Any]:
         """Modify component structure based on A/B testing pattern"""
 
-        modification_prompt = f"""
-        Based on this component analysis and A/B testing pattern, modify the component structure:
-        
-        Original Components: {json.dumps(component_map['component_hierarchy'], indent=2)}
-        
-        A/B Testing Pattern: {pattern['name']}
-        Strategy: {pattern['layout_strategy']}
-        Key Changes: {pattern['key_changes']}
-        
-        Provide a modified component structure that implements these changes:
-        1. Rearrange component priority and positioning
-        2. Modify component sizes and emphasis
-        3. Add/remove elements based on pattern
-        4. Adjust content hierarchy
-        5. Optimize for the pattern's goals
-        
-        Return as structured JSON with the new component arrangement.
-        """
+        cache_key = (hierarchy_json, pattern.id)
+        if cache_key in self._mod_cache:
+            return self._mod_cache[cache_key]
 
-        response = await self.client.chat.completions.create(
-            model="gpt-4",
+        modification_prompt = f"""Original Components: {hierarchy_json}
+
+Apply A/B testing pattern "{pattern.id}" ({pattern.name}). Return a JSON object with the fields "summary" and "full_structure"."""
+
+        modified_structure = await self._chat_completion(
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a UX expert specializing in A/B testing and conversion optimization. Modify component structures to match specific testing patterns."
+                    "content": self.MODIFICATION_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -267,44 +985,76 @@ class ABTestGenerator:
                 }
             ],
             max_tokens=1500,
-            temperature=0.2
+            temperature=0.2,
+            response_format={"type": "json_object"}
         )
 
-        # Parse the response (would need proper JSON parsing)
-        return {
-            "modification_strategy": pattern["layout_strategy"],
-            "modified_structure": response.choices[0].message.content,
-            "original_components": component_map["component_hierarchy"]
-        }
+        try:
+            payload = orjson.loads(modified_structure)
+        except orjson.JSONDecodeError:
+            payload = modified_structure
+
+        modified_components = _modification_record(pattern, payload)
+        self._mod_cache[cache_key] = modified_components
+        return modified_components
 
-    async def _generate_variation_react_code(self, modified_components: Dict[str, Any], pattern: Dict[str, Any]) -> str:
+    async def _modify_components_batch(self, hierarchy_json: str, patterns: List[ABPattern]):
+        """Modify component structure for several patterns in one request, filling the modification cache"""
+
+        missing = [p for p in patterns if (hierarchy_json, p.id) not in self._mod_cache]
+        if len(missing) < 2:
+            return
+
+        pattern_ids = ", ".join(f'"{p.id}"' for p in missing)
+        modification_prompt = f"""Original Components: {hierarchy_json}
+
+Apply each of the A/B testing patterns {pattern_ids}. Return a JSON object keyed by pattern id whose values have the fields "summary" and "full_structure"."""
+
+        try:
+            response = await self._chat_completion(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": self.MODIFICATION_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": modification_prompt
+                    }
+                ],
+                max_tokens=min(1500 * len(missing), 8000),
+                temperature=0.2,
+                response_format={"type": "json_object"}
+            )
+            structures = orjson.loads(response)
+        except Exception as e:
+            # Patterns left uncached fall back to one request each
+            logger.warning(f"  ⚠️  Batched component modification failed: {e}")
+            return
+
+        for pattern in missing:
+            structure = structures.get(pattern.id) if isinstance(structures, dict) else None
+            if structure is None:
+                continue
+            self._mod_cache[(hierarchy_json, pattern.id)] = _modification_record(
+                pattern, structure)
+
+    async def _generate_variation_react_code(self, modified_components: Dict[str, Any], pattern: ABPattern) -> str:
         """Generate React code for the A/B testing variation"""
 
-        react_prompt = f"""
-        Generate a complete React component for this A/B testing variation:
-        
-        Pattern: {pattern['name']}
-        Strategy: {pattern['layout_strategy']}
-        Modified Components: {json.dumps(modified_components, indent=2)}
-        
-        Requirements:
-        1. Implement the A/B testing pattern exactly
-        2. Use modern React with TypeScript
-        3. Include Tailwind CSS for styling
-        4. Make it responsive and accessible
-        5. Add proper conversion tracking hooks
-        6. Include A/B testing metadata
-        7. Optimize for the pattern's goals
-        
-        Generate complete, production-ready code that implements this variation.
-        """
+        cache_key = (_content_hash(modified_components), pattern.id)
+        if cache_key in self._react_cache:
+            return self._react_cache[cache_key]
 
-        response = await self.client.chat.completions.create(
-            model="gpt-4",
+        react_prompt = f"""Pattern: {pattern.name}
+Strategy: {pattern.layout_strategy}
+Layout Changes: {modified_components.get("summary") or modified_components["modified_structure"]}"""
+
+        react_code = await self._chat_completion(
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert React developer specializing in A/B testing implementations. Generate conversion-optimized React components."
+                    "content": _REACT_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -315,194 +1065,65 @@ class ABTestGenerator:
             temperature=0.1
         )
 
-        return response.choices[0].message.content
+        self._react_cache[cache_key] = react_code
+        return react_code
 
-    def _create_image_modification_prompt(self, component_map: Dict[str, Any], pattern: Dict[str, Any], modified_components: Dict[str, Any]) -> str:
+    def _create_image_modification_prompt(self, pattern: ABPattern) -> str:
         """Create modification prompt for GPT-Image-1 to transform the original screenshot"""
+        return self.IMAGE_MODIFICATION_PROMPTS[pattern.id]
 
-        # Get specific layout instructions based on pattern
-        layout_instructions = self._get_pattern_layout_instructions(pattern)
-
-        modification_prompt = f"""
-        LAYOUT REARRANGEMENT TASK: Transform the hero section from centered to two-column layout while preserving ALL original design elements.
-        
-        TRANSFORMATION GOAL: {pattern['name']} - {pattern['layout_strategy']}
-        
-        MANDATORY LAYOUT CHANGES (POSITIONING ONLY):
-        {chr(10).join([f"• {change}" for change in pattern['key_changes']])}
-        
-        SPECIFIC REARRANGEMENT INSTRUCTIONS:
-        {layout_instructions}
-        
-        EXACT POSITIONING REQUIREMENTS:
-        - Hero Section: {self._get_hero_positioning(pattern)}
-        - Navigation: {self._get_navigation_positioning(pattern)}
-        - Call-to-Action: {self._get_cta_positioning(pattern)}
-        - Content Layout: {self._get_content_positioning(pattern)}
-        
-        LAYOUT TRANSFORMATION (PRESERVE ALL STYLING):
-        - SPLIT the hero section into left text column (50%) and right demo image (50%)
-        - MOVE the headline "Trace, Debug, & Deploy Reliable AI Agents" to LEFT side
-        - MOVE the description text to LEFT side below headline
-        - MOVE the CTA button to LEFT side below description
-        - ADD a dashboard/interface mockup on RIGHT side showing AgentOps platform
-        - KEEP all colors, fonts, styling, and branding identical to original
-        
-        CRITICAL DESIGN PRESERVATION:
-        - Use EXACT same purple/blue color scheme from original
-        - Use EXACT same fonts and typography from original
-        - Use EXACT same button styling and colors from original
-        - Keep EXACT same background colors and overall aesthetic
-        - Preserve the AgentOps logo and navigation exactly as shown
-        - Maintain the same professional, clean visual style
-        
-        RESULT: Should look like the same AgentOps website with hero content rearranged into two columns - identical styling, just different layout positioning.
-        """
-
-        return modification_prompt
-
-    def _get_pattern_layout_instructions(self, pattern: Dict[str, Any]) -> str:
-        """Get specific layout instructions for each A/B testing pattern"""
-        pattern_instructions = {
-            "1": """
-            CRITICAL: CREATE A DRAMATIC TWO-COLUMN LAYOUT TRANSFORMATION:
-            
-            LEFT COLUMN (50% width):
-            - Move ALL hero text content to the LEFT side of the screen
-            - Stack the headline, subheadline, and description vertically on the left
-            - Place call-to-action buttons below the text on the left side
-            - Add company logos/social proof at the bottom of left column
-            - Left-align all text content (not centered)
-            
-            RIGHT COLUMN (50% width):
-            - Create a large demo/dashboard mockup image on the RIGHT side
-            - Show a product interface, dashboard, or application screenshot
-            - Make this visual element take up the entire right half
-            - Add subtle shadows or modern styling to the demo image
-            
-            LAYOUT TRANSFORMATION:
-            - Split the hero section into two equal columns (50/50)
-            - Remove the centered layout completely
-            - Create clear visual separation between left text and right image
-            - Ensure the demo image is prominent and engaging
-            - Make the layout feel like a modern SaaS landing page
-            """,
-            "2": """
-            - Create a 3-column grid layout for main features
-            - Add multiple call-to-action buttons (one per feature)
-            - Make feature cards more prominent with icons or images
-            - Distribute content more evenly across the page
-            - Add hover effects and interactive elements
-            - Include multiple entry points for different user types
-            """,
-            "3": """
-            - Add more detailed descriptions and explanations
-            - Include an FAQ section or detailed product information
-            - Add testimonials, case studies, or social proof
-            - Create expandable sections for additional information
-            - Include comparison tables or feature lists
-            - Add educational content or how-it-works sections
-            """,
-            "4": """
-            - Add urgency indicators (limited time offers, countdown timers)
-            - Include social proof badges (customer count, ratings)
-            - Add trust signals (security badges, certifications)
-            - Create scarcity elements (limited availability)
-            - Include customer testimonials prominently
-            - Add risk-reduction elements (money-back guarantee, free trial)
-            """
-        }
-        return pattern_instructions.get(pattern.get('id', '1'), pattern_instructions['1'])
-
-    def _get_hero_positioning(self, pattern: Dict[str, Any]) -> str:
-        """Get hero section positioning for the pattern"""
-        hero_positions = {
-            "1": "Two-column split layout: Left side text content, Right side demo/dashboard image",
-            "2": "Moderate size with grid elements below",
-            "3": "Smaller hero with more content sections",
-            "4": "Prominent with urgency elements and social proof"
-        }
-        return hero_positions.get(pattern.get('id', '1'), hero_positions['1'])
-
-    def _get_navigation_positioning(self, pattern: Dict[str, Any]) -> str:
-        """Get navigation positioning for the pattern"""
-        nav_positions = {
-            "1": "Minimal, clean navigation with essential items only",
-            "2": "Standard navigation with multiple entry points",
-            "3": "Detailed navigation with more menu items",
-            "4": "Navigation with trust signals and contact info"
-        }
-        return nav_positions.get(pattern.get('id', '1'), nav_positions['1'])
-
-    def _get_cta_positioning(self, pattern: Dict[str, Any]) -> str:
-        """Get call-to-action positioning for the pattern"""
-        cta_positions = {
-            "1": "Primary CTA button positioned in left column below the headline text",
-            "2": "Multiple CTAs distributed across feature sections",
-            "3": "CTAs placed after detailed explanations",
-            "4": "Prominent CTAs with urgency and social proof"
-        }
-        return cta_positions.get(pattern.get('id', '1'), cta_positions['1'])
-
-    def _get_content_positioning(self, pattern: Dict[str, Any]) -> str:
-        """Get content positioning for the pattern"""
-        content_positions = {
-            "1": "Hero content split into left text column and right demo image, company logos below",
-            "2": "Grid-based content with equal visual weight",
-            "3": "Rich, detailed content with multiple sections",
-            "4": "Content focused on conversion with social proof"
-        }
-        return content_positions.get(pattern.get('id', '1'), content_positions['1'])
-
-    async def _generate_variation_image_with_screenshot(self, component_map: Dict[str, Any], modification_prompt: str, pattern: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_variation_image_with_screenshot(self, component_map: Dict[str, Any], modification_prompt: str, pattern: ABPattern) -> Dict[str, Any]:
         """Generate variation image using original screenshot as input with GPT-Image-1 edit API"""
 
         try:
-            print("    🎨 Generating variation image with GPT-Image-1...")
+            logger.info("    🎨 Generating variation image with GPT-Image-1...")
 
             # Get the original screenshot file path
             original_screenshot_path = self._get_original_screenshot_path(
                 component_map)
 
             if not original_screenshot_path:
-                print("    ⚠️  No original screenshot found, using text-only generation")
+                logger.warning("    ⚠️  No original screenshot found, using text-only generation")
                 return await self._generate_text_only_variation(modification_prompt, pattern)
 
-            # Get original screenshot dimensions for optimal sizing
-            original_width, original_height = self._get_screenshot_dimensions(
-                original_screenshot_path)
-            optimal_size = self._get_optimal_generation_size(
-                original_width, original_height)
+            # Get original screenshot dimensions for optimal sizing (probed once per screenshot)
+            screenshot_stat = os.stat(original_screenshot_path)
+            original_width, original_height, optimal_size = self._get_screenshot_geometry(
+                original_screenshot_path, screenshot_stat.st_mtime_ns)
 
             # Enhance the prompt with design-centric instructions
             design_enhanced_prompt = self._add_design_preservation_instructions(
                 modification_prompt, original_width, original_height)
 
-            # Use GPT-Image-1 edit API with screenshot input and enhanced prompt
-            with open(original_screenshot_path, 'rb') as img_file:
-                response = await self.client.images.edit(
-                    model="gpt-image-1",
-                    image=img_file,
-                    prompt=design_enhanced_prompt,
-                    size=optimal_size
-                )
+            local_path = f"outputs/variations/variation_{self._run_tag}_{pattern.layout_strategy}.png"
 
-            # Get base64 image data directly
-            image_b64 = response.data[0].b64_json
+            # The edit result depends on the prompt, output size and the input screenshot
+            cache_key = self._image_cache_key(
+                "gpt-image-1", optimal_size, design_enhanced_prompt,
+                original_screenshot_path, str(screenshot_stat.st_mtime_ns))
+            cache_hit = self._restore_cached_image(cache_key, local_path)
 
-            # Decode and save image locally
-            import base64
-            image_bytes = base64.b64decode(image_b64)
-
-            # Create variations directory
-            os.makedirs("outputs/variations", exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            local_path = f"outputs/variations/variation_{timestamp}.png"
+            if cache_hit:
+                logger.info(f"    ♻️  Reused cached variation image: {local_path}")
+            else:
+                # Use GPT-Image-1 edit API with screenshot input and enhanced prompt
+                screenshot_file = await self._read_upload(original_screenshot_path)
+                async with self._api_slot(image=True):
+                    response = await self.client.images.edit(
+                        model="gpt-image-1",
+                        image=screenshot_file,
+                        prompt=design_enhanced_prompt,
+                        size=optimal_size
+                    )
+
+                # Get base64 image data directly
+                image_b64 = response.data[0].b64_json
 
-            with open(local_path, 'wb') as f:
-                f.write(image_bytes)
+                # Decode and save image locally
+                await self._save_b64_image(image_b64, local_path)
+                self._store_cached_image(cache_key, local_path)
 
-            print(f"    ✅ Variation image saved: {local_path}")
+                logger.info(f"    ✅ Variation image saved: {local_path}")
 
             return {
                 "local_path": local_path,
@@ -511,31 +1132,104 @@ class ABTestGenerator:
                 "original_screenshot_path": original_screenshot_path,
                 "original_dimensions": f"{original_width}x{original_height}",
                 "generated_size": optimal_size,
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": self._run_iso,
                 "model": "gpt-image-1",
-                "pattern": pattern['name']
+                "pattern": pattern.name,
+                "cache_hit": cache_hit
             }
 
         except Exception as e:
-            print(f"    ❌ Failed to generate variation image: {e}")
+            logger.error(f"    ❌ Failed to generate variation image: {e}")
             return {
                 "error": str(e),
                 "modification_prompt": modification_prompt,
                 "original_screenshot_path": original_screenshot_path if 'original_screenshot_path' in locals() else None,
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": self._run_iso,
                 "model": "gpt-image-1",
-                "pattern": pattern['name']
+                "pattern": pattern.name
             }
 
+    async def _save_b64_image(self, image_b64: str, local_path: str):
+        """Decode a GPT-Image-1 b64_json payload and write it to disk"""
+        # Decode slice by slice so concurrent variations never hold a second, decoded
+        # copy of every multi-MB PNG at once; slices are a multiple of 4 characters.
+        # The temp file is renamed into place, so an image cache entry linked to
+        # local_path is never written through
+        tmp_path = f"{local_path}.{os.getpid()}.{id(image_b64):x}.tmp"
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            for start in range(0, len(image_b64), _B64_CHUNK):
+                await f.write(base64.b64decode(image_b64[start:start + _B64_CHUNK]))
+        os.replace(tmp_path, local_path)
+
+    @staticmethod
+    async def _replace_file(path: str, data: bytes):
+        """Write data to a temp file and rename it over path, never into an existing inode"""
+        tmp_path = f"{path}.{os.getpid()}.{id(data):x}.tmp"
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            await f.write(data)
+        os.replace(tmp_path, path)
+
+    async def _read_upload(self, path: str) -> Tuple[str, bytes]:
+        """Read a file once per (path, mtime) without blocking the loop, as a (filename, bytes) upload"""
+        cache_key = (path, os.stat(path).st_mtime_ns)
+        read_task = self._upload_cache.get(cache_key)
+        if read_task is None:
+            read_task = asyncio.create_task(self._read_bytes(path))
+            self._upload_cache[cache_key] = read_task
+        try:
+            # Shielded so one cancelled variation doesn't cancel the read its siblings await
+            data = await asyncio.shield(read_task)
+        except Exception:
+            self._upload_cache.pop(cache_key, None)
+            raise
+        return os.path.basename(path), data
+
+    @staticmethod
+    async def _read_bytes(path: str) -> bytes:
+        """Read a whole file through aiofiles"""
+        async with aiofiles.open(path, 'rb') as f:
+            return await f.read()
+
+    def _image_cache_key(self, *parts: str) -> str:
+        """Hash the inputs that determine a generated image"""
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+    def _restore_cached_image(self, cache_key: str, local_path: str) -> bool:
+        """Link a previously generated image to local_path; returns False on a miss"""
+        if not self.config.CACHE_IMAGES:
+            return False
+        cached_path = os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.png")
+        if not os.path.isfile(cached_path):
+            return False
+        self._link_or_copy(cached_path, local_path)
+        return True
+
+    def _store_cached_image(self, cache_key: str, local_path: str):
+        """Add a freshly generated image to the image cache"""
+        if not self.config.CACHE_IMAGES:
+            return
+        cached_path = os.path.join(IMAGE_CACHE_DIR, f"{cache_key}.png")
+        if not os.path.exists(cached_path):
+            self._link_or_copy(local_path, cached_path)
+
+    @staticmethod
+    def _link_or_copy(source: str, destination: str):
+        """Hardlink source to destination, falling back to a copy across devices"""
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
     async def _quality_check_image(self, image_path: str) -> Dict[str, Any]:
         """Use GPT-4o to analyze generated image for quality issues"""
 
-        print("    🔍 Running quality check on generated image...")
+        logger.info("    🔍 Running quality check on generated image...")
 
         # Read the generated image
-        with open(image_path, 'rb') as img_file:
-            import base64
-            image_data = base64.b64encode(img_file.read()).decode('utf-8')
+        async with aiofiles.open(image_path, 'rb') as img_file:
+            image_data = base64.b64encode(await img_file.read()).decode('utf-8')
 
         quality_check_prompt = """
         Analyze this generated A/B testing variation image for quality issues. Look specifically for:
@@ -593,42 +1287,39 @@ class ABTestGenerator:
         ]
 
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o",  # Using GPT-4o for vision analysis
-                messages=messages,
-                max_tokens=1000,
-                temperature=0.1
-            )
+            async with self._api_slot():
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o",  # Using GPT-4o for vision analysis
+                    messages=messages,
+                    max_tokens=1000,
+                    temperature=0.1,
+                    response_format={"type": "json_object"}
+                )
 
             # Parse the response
             if response.choices and len(response.choices) > 0 and response.choices[0].message.content:
                 response_text = response.choices[0].message.content
 
-                # Extract JSON from response
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-
-                if json_start != -1 and json_end > 0:
-                    json_text = response_text[json_start:json_end]
-                    quality_analysis = json.loads(json_text)
+                # JSON mode guarantees the whole message is one JSON object
+                quality_analysis = orjson.loads(response_text)
 
                 # Log issues found
                 if quality_analysis.get('has_issues', False):
-                    print(
+                    logger.warning(
                         f"    ⚠️  Quality issues found: {len(quality_analysis.get('issues', []))} issues")
                     for issue in quality_analysis.get('issues', []):
-                        print(
+                        logger.info(
                             f"       - {issue['type']}: {issue['description'][:50]}...")
                 else:
-                    print("    ✅ No quality issues detected")
+                    logger.info("    ✅ No quality issues detected")
 
                 return quality_analysis
             else:
-                print("    ⚠️  Could not parse quality check response")
+                logger.warning("    ⚠️  Could not parse quality check response")
                 return {"has_issues": False, "regeneration_needed": False}
 
         except Exception as e:
-            print(f"    ❌ Quality check failed: {e}")
+            logger.error(f"    ❌ Quality check failed: {e}")
             return {"has_issues": False, "regeneration_needed": False, "error": str(e)}
 
     async def _regenerate_with_feedback(
@@ -636,12 +1327,12 @@ class ABTestGenerator:
         original_image_path: str,
         original_prompt: str,
         quality_feedback: Dict[str, Any],
-        pattern: Dict[str, Any],
+        pattern: ABPattern,
         component_map: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Regenerate image incorporating quality feedback"""
 
-        print("    🔄 Regenerating image with quality improvements...")
+        logger.info("    🔄 Regenerating image with quality improvements...")
 
         # Build feedback instructions
         feedback_instructions = "\n\nCRITICAL QUALITY IMPROVEMENTS NEEDED:\n"
@@ -670,328 +1361,246 @@ ADDITIONAL QUALITY REQUIREMENTS:
             component_map)
 
         if not original_screenshot_path:
-            print("    ⚠️  No original screenshot found for regeneration")
+            logger.warning("    ⚠️  No original screenshot found for regeneration")
             return {"error": "No original screenshot available"}
 
         try:
-            # Regenerate with enhanced prompt
-            with open(original_screenshot_path, 'rb') as img_file:
-                response = await self.client.images.edit(
-                    model="gpt-image-1",
-                    image=img_file,
-                    prompt=enhanced_prompt,
-                    size="1024x1024"  # type: ignore
-                )
+            improved_path = f"outputs/variations/variation_{self._run_tag}_{pattern.layout_strategy}_improved.png"
+
+            # Same content-addressed cache as the first edit; the feedback is part of the prompt
+            screenshot_stat = os.stat(original_screenshot_path)
+            cache_key = self._image_cache_key(
+                "gpt-image-1", "1024x1024", enhanced_prompt,
+                original_screenshot_path, str(screenshot_stat.st_mtime_ns))
+            cache_hit = self._restore_cached_image(cache_key, improved_path)
+
+            if cache_hit:
+                logger.info(f"    ♻️  Reused cached improved image: {improved_path}")
+            else:
+                # Regenerate with enhanced prompt
+                screenshot_file = await self._read_upload(original_screenshot_path)
+                async with self._api_slot(image=True):
+                    response = await self.client.images.edit(
+                        model="gpt-image-1",
+                        image=screenshot_file,
+                        prompt=enhanced_prompt,
+                        size="1024x1024"  # type: ignore
+                    )
 
                 # Get base64 image data
-            if response.data and len(response.data) > 0 and response.data[0].b64_json:
-                image_b64 = response.data[0].b64_json
+                if not (response.data and len(response.data) > 0 and response.data[0].b64_json):
+                    logger.error("    ❌ No image data in response")
+                    return {"error": "No image data in response"}
 
                 # Decode and save improved image
-                import base64
-                image_bytes = base64.b64decode(image_b64)
-
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                improved_path = f"outputs/variations/variation_{timestamp}_improved.png"
-
-                with open(improved_path, 'wb') as f:
-                    f.write(image_bytes)
-
-                print(f"    ✅ Improved variation image saved: {improved_path}")
-
-                return {
-                    "local_path": improved_path,
-                    "modification_prompt": enhanced_prompt,
-                    "original_screenshot_used": True,
-                    "original_screenshot_path": original_screenshot_path,
-                    "generated_at": datetime.now().isoformat(),
-                    "model": "gpt-image-1",
-                    "pattern": pattern['name'],
-                    "quality_improved": True,
-                    "improvements_applied": [issue['type'] for issue in quality_feedback.get('issues', [])]
-                }
-            else:
-                print("    ❌ No image data in response")
-                return {"error": "No image data in response"}
+                await self._save_b64_image(response.data[0].b64_json, improved_path)
+                self._store_cached_image(cache_key, improved_path)
+
+                logger.info(f"    ✅ Improved variation image saved: {improved_path}")
+
+            return {
+                "local_path": improved_path,
+                "modification_prompt": enhanced_prompt,
+                "original_screenshot_used": True,
+                "original_screenshot_path": original_screenshot_path,
+                "generated_at": self._run_iso,
+                "model": "gpt-image-1",
+                "pattern": pattern.name,
+                "quality_improved": True,
+                "improvements_applied": [issue['type'] for issue in quality_feedback.get('issues', [])],
+                "cache_hit": cache_hit
+            }
 
         except Exception as e:
-            print(f"    ❌ Failed to regenerate improved image: {e}")
+            logger.error(f"    ❌ Failed to regenerate improved image: {e}")
             return {"error": str(e)}
 
     def _get_original_screenshot_path(self, component_map: Dict[str, Any]) -> Optional[str]:
         """Get original screenshot file path from component map"""
+        # Memoized per run; every variation and regeneration asks for the same file
+        cache_key = tuple(
+            segment.get('screenshot_path') for segment in component_map.get('segments', ()))
+        if cache_key not in self._screenshot_path_cache:
+            self._screenshot_path_cache[cache_key] = self._find_original_screenshot(component_map)
+        return self._screenshot_path_cache[cache_key]
+
+    def _find_original_screenshot(self, component_map: Dict[str, Any]) -> Optional[str]:
+        """Locate the original screenshot: segment captures first, then known output paths"""
         try:
             # Look for screenshot paths in the component map
-            if 'segments' in component_map:
-                for segment in component_map['segments']:
-                    if 'screenshot_path' in segment and os.path.exists(segment['screenshot_path']):
-                        return segment['screenshot_path']
+            for segment in component_map.get('segments', ()):
+                screenshot_path = segment.get('screenshot_path')
+                if screenshot_path and os.path.isfile(screenshot_path):
+                    return screenshot_path
 
             # Fallback: look for screenshot files in common locations
-            screenshot_files = [
-                "outputs/screenshots/www.agentops.ai_.png",
-                "outputs/screenshots/segment_1_top.png",
-                "segment_1_top.png",
-                "outputs/screenshots/segment_2_quarter.png",
-                "segment_2_quarter.png"
-            ]
-
-            for screenshot_file in screenshot_files:
-                if os.path.exists(screenshot_file):
+            for screenshot_file in _SCREENSHOT_FALLBACKS:
+                if os.path.isfile(screenshot_file):
                     return screenshot_file
 
             return None
 
         except Exception as e:
-            print(f"    ⚠️  Could not find original screenshot: {e}")
+            logger.warning(f"    ⚠️  Could not find original screenshot: {e}")
             return None
 
+    def _get_screenshot_geometry(self, screenshot_path: str, mtime_ns: int) -> Tuple[int, int, str]:
+        """Screenshot width, height and GPT-Image-1 size, memoized per (path, mtime)"""
+        cache_key = (screenshot_path, mtime_ns)
+        if cache_key not in self._geometry_cache:
+            width, height = self._get_screenshot_dimensions(screenshot_path)
+            self._geometry_cache[cache_key] = (
+                width, height, self._get_optimal_generation_size(width, height))
+        return self._geometry_cache[cache_key]
+
     def _get_screenshot_dimensions(self, screenshot_path: str) -> tuple[int, int]:
         """Get dimensions of the original screenshot"""
         try:
-            from PIL import Image
-            with Image.open(screenshot_path) as img:
-                return img.size  # Returns (width, height)
+            stat = os.stat(screenshot_path)
+            return _probe_image_size(screenshot_path, stat.st_mtime_ns, stat.st_size)
         except Exception as e:
-            print(f"    ⚠️  Could not get screenshot dimensions: {e}")
+            logger.warning(f"    ⚠️  Could not get screenshot dimensions: {e}")
             return (1365, 768)  # Default web dimensions
 
     def _get_optimal_generation_size(self, original_width: int, original_height: int) -> str:
         """Get the best GPT-Image-1 size that matches the original aspect ratio"""
         aspect_ratio = original_width / original_height
 
-        # Available GPT-Image-1 sizes
-        available_sizes = {
-            # Landscape 3:2 - BEST for desktop
-            "1536x1024": (1536, 1024, 1.5),
-            "1024x1024": (1024, 1024, 1.0),           # Square
-            # Portrait 2:3 - mobile-like
-            "1024x1536": (1024, 1536, 0.667),
-        }
-
         # For desktop screenshots (width > height), prioritize landscape
         if original_width > original_height:
-            print(f"    💻 Desktop layout detected (width > height)")
-            print(
-                f"    📐 Original: {original_width}x{original_height} (ratio: {aspect_ratio:.2f})")
-            print(
+            logger.debug("    💻 Desktop layout detected (width > height)")
+            logger.debug("    📐 Original: %dx%d (ratio: %.2f)",
+                         original_width, original_height, aspect_ratio)
+            logger.warning(
                 f"    ⚠️  GPT-Image-1 limitation: Cannot generate {original_width}x{original_height}")
-            print(f"    📐 Using best available: 1536x1024 landscape for desktop view")
-            print(
-                f"    🎯 Focusing on hero section transformation within available dimensions")
+            logger.debug("    📐 Using best available: 1536x1024 landscape for desktop view")
+            logger.debug("    🎯 Focusing on hero section transformation within available dimensions")
             return "1536x1024"
 
         # For other cases, find the closest aspect ratio
-        best_size = "1024x1024"
-        best_diff = float('inf')
-
-        for size_name, (width, height, ratio) in available_sizes.items():
-            diff = abs(aspect_ratio - ratio)
-            if diff < best_diff:
-                best_diff = diff
-                best_size = size_name
+        best_size = min(_GPT_IMAGE_SIZES, key=lambda size: abs(aspect_ratio - size[1]))[0]
 
-        print(
-            f"    📐 Original: {original_width}x{original_height} (ratio: {aspect_ratio:.2f})")
-        print(f"    📐 Using GPT-Image-1 size: {best_size}")
+        logger.debug("    📐 Original: %dx%d (ratio: %.2f)",
+                     original_width, original_height, aspect_ratio)
+        logger.debug("    📐 Using GPT-Image-1 size: %s", best_size)
 
         return best_size
 
     def _add_design_preservation_instructions(self, modification_prompt: str, original_width: int, original_height: int) -> str:
         """Add design-centric instructions to preserve the natural flow and organic feel"""
+        return _render_design_instructions(original_width, original_height, modification_prompt)
 
-        design_instructions = f"""
-        CRITICAL DESIGN PRESERVATION - ZERO TOLERANCE FOR CHANGES:
-        
-        ABSOLUTE COLOR PRESERVATION:
-        - Keep EXACT same background colors (light gray/white backgrounds)
-        - Keep EXACT same text colors (black text, purple accents)
-        - Keep EXACT same button colors (purple/blue gradients)
-        - Keep EXACT same brand colors throughout
-        - DO NOT change any color schemes, gradients, or hues
-        - DO NOT alter the visual color palette in any way
-        
-        ABSOLUTE TYPOGRAPHY PRESERVATION:
-        - Keep EXACT same fonts and font families
-        - Keep EXACT same font weights (bold headings, regular body text)
-        - Keep EXACT same font sizes and text hierarchy
-        - Keep EXACT same text styling and formatting
-        - DO NOT change typography or text appearance
-        
-        ABSOLUTE VISUAL STYLE PRESERVATION:
-        - Keep EXACT same shadows, borders, and visual effects
-        - Keep EXACT same spacing patterns and padding
-        - Keep EXACT same visual treatments and styling
-        - Keep EXACT same design system elements
-        - DO NOT alter the overall aesthetic or visual style
-        
-        DIMENSION OPTIMIZATION FOR GPT-IMAGE-1:
-        - Original screenshot: {original_width}x{original_height} pixels (desktop full-page)
-        - GPT-Image-1 limitation: Cannot generate original dimensions
-        - CRITICAL: Use landscape 1536x1024 format to maximize desktop layout space
-        - Focus on the HERO SECTION and top portion of the page for transformation
-        - Ensure the two-column layout fits naturally within the generated dimensions
-        
-        LAYOUT REARRANGEMENT ONLY:
-        - This is ONLY a component rearrangement, NOT a redesign
-        - Move existing elements to new positions without changing their appearance
-        - Split hero section into left text column and right demo image
-        - Preserve all original design elements exactly as they appear
-        - Focus transformation on the main hero/content area
-        
-        STRICT CONSTRAINTS:
-        - DO NOT change colors, fonts, or visual styling
-        - DO NOT redesign or recreate any elements  
-        - DO NOT alter the brand appearance or aesthetic
-        - DO NOT crop or cut off important content
-        - DO NOT change the overall professional appearance
-        
-        {modification_prompt}
-        
-        FINAL RESULT REQUIREMENTS:
-        - Should look like the same website with rearranged layout
-        - All colors, fonts, and styling should be identical to original
-        - Only the positioning and arrangement should be different
-        - Must maintain the AgentOps brand identity perfectly
-        - Should feel like a natural layout variation, not a different design
-        """
-
-        return design_instructions
-
-    async def _generate_text_only_variation(self, modification_prompt: str, pattern: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_text_only_variation(self, modification_prompt: str, pattern: ABPattern) -> Dict[str, Any]:
         """Fallback: Generate variation using text-only prompt"""
 
-        text_prompt = f"""
-        Create a modern website landing page design for A/B testing:
-        
-        PATTERN: {pattern['name']} - {pattern['description']}
-        
-        LAYOUT REQUIREMENTS:
-        {chr(10).join([f"• {change}" for change in pattern['key_changes']])}
-        
-        DESIGN SPECIFICATIONS:
-        - Professional business website aesthetic
-        - Modern, clean design with good conversion potential
-        - Clear visual hierarchy and user flow
-        - Responsive design principles
-        - High-converting landing page layout
-        
-        STYLE: Clean, modern, professional website design, flat design, minimal shadows, contemporary UI/UX, optimized for conversions
-        """
+        text_prompt = self.TEXT_ONLY_PROMPTS.get(pattern.id)
+        if text_prompt is None:
+            text_prompt = _build_text_only_prompt(pattern)
 
         try:
-            response = await self.client.images.generate(
-                model="gpt-image-1",
-                prompt=text_prompt,
-                size="1024x1024",
-                n=1
-            )
+            local_path = f"outputs/variations/variation_text_{self._run_tag}_{pattern.layout_strategy}.png"
+
+            cache_key = self._image_cache_key(
+                "gpt-image-1", "1024x1024", text_prompt)
+            cache_hit = self._restore_cached_image(cache_key, local_path)
 
-            image_b64 = response.data[0].b64_json
-            import base64
-            image_bytes = base64.b64decode(image_b64)
+            if not cache_hit:
+                async with self._api_slot(image=True):
+                    response = await self.client.images.generate(
+                        model="gpt-image-1",
+                        prompt=text_prompt,
+                        size="1024x1024",
+                        n=1
+                    )
 
-            os.makedirs("outputs/variations", exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            local_path = f"outputs/variations/variation_text_{timestamp}.png"
+                image_b64 = response.data[0].b64_json
 
-            with open(local_path, 'wb') as f:
-                f.write(image_bytes)
+                await self._save_b64_image(image_b64, local_path)
+                self._store_cached_image(cache_key, local_path)
 
             return {
                 "local_path": local_path,
                 "text_prompt": text_prompt,
                 "method": "text_only_fallback",
-                "generated_at": datetime.now().isoformat(),
-                "model": "gpt-image-1"
+                "generated_at": self._run_iso,
+                "model": "gpt-image-1",
+                "cache_hit": cache_hit
             }
 
         except Exception as e:
             return {
                 "error": str(e),
                 "method": "text_only_fallback",
-                "generated_at": datetime.now().isoformat()
+                "generated_at": self._run_iso
             }
 
-    def _extract_colors(self, component_map: Dict[str, Any]) -> str:
-        """Extract color information from component analysis"""
-        # This would extract from the actual analysis
-        return "Modern purple and blue gradient (#6366F1, #8B5CF6), white backgrounds, dark text"
-
-    def _extract_typography(self, component_map: Dict[str, Any]) -> str:
-        """Extract typography information from component analysis"""
-        # This would extract from the actual analysis
-        return "Clean sans-serif fonts, bold headings, readable body text"
-
-    def _get_expected_improvements(self, pattern_id: str) -> List[str]:
+    def _get_expected_improvements(self, pattern_id: str) -> Tuple[str, ...]:
         """Get expected improvements for each A/B testing pattern"""
-        improvements = {
-            "1": [
-                "Higher conversion rates from clear CTA",
-                "Reduced bounce rate from focused messaging",
-                "Better mobile experience"
-            ],
-            "2": [
-                "Increased feature discovery",
-                "Higher engagement with multiple CTAs",
-                "Better for complex products"
-            ],
-            "3": [
-                "Improved user education",
-                "Higher qualified leads",
-                "Better for B2B conversions"
-            ],
-            "4": [
-                "Urgency-driven conversions",
-                "Social proof validation",
-                "Reduced decision friction"
-            ]
-        }
-        return improvements.get(pattern_id, [])
+        return _EXPECTED_IMPROVEMENTS.get(pattern_id, ())
 
-    def _generate_comparison_metrics(self, variations: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_comparison_metrics(self, variations: Dict[str, Any]) -> Mapping[str, Any]:
         """Generate comparison metrics for A/B testing"""
-        return {
-            "suggested_metrics": [
-                "Conversion rate",
-                "Click-through rate",
-                "Bounce rate",
-                "Time on page",
-                "Scroll depth"
-            ],
-            "testing_duration": "2-4 weeks",
-            "minimum_sample_size": "1000 visitors per variation",
-            "statistical_significance": "95% confidence level"
-        }
+        return _COMPARISON_METRICS
 
-    async def save_ab_test_package(self, ab_test_package: Dict[str, Any], output_dir: str = "ab_tests") -> str:
+    async def save_ab_test_package(self, ab_test_package: Dict[str, Any], output_dir: str = "ab_tests", durable: bool = False) -> str:
         """Save complete A/B testing package"""
 
         # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
+        self._ensure_dir(output_dir)
 
         # Save main package
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         package_file = os.path.join(
-            output_dir, f"ab_test_package_{timestamp}.json")
-
-        with open(package_file, 'w') as f:
-            json.dump(ab_test_package, f, indent=2)
-
-        # Save individual React components for each variation
-        for var_id, variation in ab_test_package["variations"].items():
+            output_dir, f"ab_test_package_{self._run_tag}.json")
+
+        compress = self.config.COMPRESS_PACKAGES
+        json_file = package_file
+        if compress:
+            package_file = f"{json_file}.zst"
+
+        async def _write_package():
+            # Sorted keys keep the bytes stable across runs for the same content
+            data = orjson.dumps(
+                ab_test_package,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | _JSON_OPTIONS
+            )
+            if not compress or self.config.KEEP_UNCOMPRESSED_PACKAGES:
+                async with aiofiles.open(json_file, 'wb') as f:
+                    await f.write(data)
+            if compress:
+                import zstandard as zstd
+                compressed = await asyncio.to_thread(zstd.ZstdCompressor(level=3).compress, data)
+                async with aiofiles.open(package_file, 'wb') as f:
+                    await f.write(compressed)
+
+        async def _write_one(var_id: str, variation: Dict[str, Any]):
             var_dir = os.path.join(output_dir, var_id)
-            os.makedirs(var_dir, exist_ok=True)
-
-            # Save React code
-            react_file = os.path.join(var_dir, f"{var_id}.tsx")
-            with open(react_file, 'w') as f:
-                f.write(variation["react_code"])
+            self._ensure_dir(var_dir)
 
             # Save variation details
             details_file = os.path.join(var_dir, "variation_details.json")
-            with open(details_file, 'w') as f:
-                json.dump(variation, f, indent=2)
+            async with aiofiles.open(details_file, 'wb') as f:
+                await f.write(orjson.dumps(
+                    variation, default=_json_default, option=orjson.OPT_INDENT_2 | _JSON_OPTIONS))
+
+            # Save React code, unless it was left out of the run
+            code = variation.get("react_code")
+            if code is None:
+                return
+            await self._replace_file(os.path.join(var_dir, f"{var_id}.tsx"), code.encode())
+
+        # Write the package and every variation's files concurrently
+        await asyncio.gather(
+            _write_package(),
+            *[
+                _write_one(var_id, variation)
+                for var_id, variation in ab_test_package["variations"].items()
+            ]
+        )
+
+        # One flush for the whole batch instead of fsync per file
+        if durable:
+            await asyncio.to_thread(os.sync)
 
-        print(f"💾 A/B test package saved: {package_file}")
+        logger.info(f"💾 A/B test package saved: {package_file}")
         return package_file
@@ -0,0 +1,132 @@
+"""
+Analysis status store for the web interface
+SQLite-backed, so every server worker sees the same analysis records
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+import aiosqlite
+
+
+def _remove_results_files(results_paths: List[str]):
+    """Delete results files and their gzipped copies"""
+    for results_path in results_paths:
+        for file_path in (results_path, f"{results_path}.gz"):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+
+class AnalysisStore:
+    """Analysis status records in a shared SQLite database (WAL mode)"""
+
+    def __init__(self, db_path: str = "outputs/analyses/results.db"):
+        self.db_path = db_path
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def open(self):
+        """Open the shared connection and create the table if needed"""
+        self._db = await aiosqlite.connect(self.db_path)
+        self._db.row_factory = aiosqlite.Row
+        # WAL lets other workers read status while one of them writes
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute("PRAGMA busy_timeout=5000")
+        await self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analyses (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                url TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                completed_at TEXT,
+                results_path TEXT,
+                error TEXT
+            )
+            """
+        )
+        await self._db.commit()
+
+    async def close(self):
+        """Close the shared connection"""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def create(self, analysis_id: str, url: str, created_at: str):
+        """Record a new analysis as processing"""
+        await self._db.execute(
+            "INSERT INTO analyses (id, status, url, created_at) VALUES (?, 'processing', ?, ?)",
+            (analysis_id, url, created_at)
+        )
+        await self._db.commit()
+
+    async def get(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch an analysis record, or None if it is unknown"""
+        async with self._db.execute(
+            "SELECT id, status, url, created_at, completed_at, results_path, error "
+            "FROM analyses WHERE id = ?",
+            (analysis_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    async def complete(self, analysis_id: str, results_path: str):
+        """Mark an analysis completed once its results file is written"""
+        await self._db.execute(
+            "UPDATE analyses SET status = 'completed', completed_at = ?, results_path = ? WHERE id = ?",
+            (datetime.now().isoformat(), results_path, analysis_id)
+        )
+        await self._db.commit()
+
+    async def fail(self, analysis_id: str, error: str):
+        """Mark an analysis failed"""
+        await self._db.execute(
+            "UPDATE analyses SET status = 'failed', completed_at = ?, error = ? WHERE id = ?",
+            (datetime.now().isoformat(), error, analysis_id)
+        )
+        await self._db.commit()
+
+    async def prune(self, ttl_seconds: int, max_records: int, stale_seconds: int):
+        """Fail analyses stuck processing, then drop finished ones past their TTL and the
+        oldest finished ones over the cap, along with their results files"""
+        now = datetime.now()
+        # A worker that died mid-analysis never updates its row; give pollers an answer
+        await self._db.execute(
+            "UPDATE analyses SET status = 'failed', completed_at = ?, error = ? "
+            "WHERE completed_at IS NULL AND created_at < ?",
+            (
+                now.isoformat(),
+                "Analysis did not finish; the worker running it may have stopped",
+                (now - timedelta(seconds=stale_seconds)).isoformat()
+            )
+        )
+
+        cutoff = (now - timedelta(seconds=ttl_seconds)).isoformat()
+        results_paths = await self._delete_rows(
+            "SELECT id, results_path FROM analyses WHERE completed_at IS NOT NULL AND completed_at < ?",
+            (cutoff,)
+        )
+        results_paths += await self._delete_rows(
+            """
+            SELECT id, results_path FROM analyses WHERE completed_at IS NOT NULL
+            ORDER BY created_at
+            LIMIT max(0, (SELECT COUNT(*) FROM analyses) - ?)
+            """,
+            (max_records,)
+        )
+        await self._db.commit()
+
+        if results_paths:
+            await asyncio.to_thread(_remove_results_files, results_paths)
+
+    async def _delete_rows(self, query: str, params: tuple) -> List[str]:
+        """Delete the rows an (id, results_path) SELECT returns; returns their results paths"""
+        async with self._db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        await self._db.executemany(
+            "DELETE FROM analyses WHERE id = ?", [(row["id"],) for row in rows])
+        return [row["results_path"] for row in rows if row["results_path"]]
@@ -5,27 +5,50 @@ Provides REST API and simple web UI for design system extraction
 """
 
 import asyncio
-import json
+import gzip
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
-import aiofiles
+import orjson
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, ORJSONResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, HttpUrl
 import uvicorn
 
 from vision_analyzer import VisionAnalyzer
 from config import Config
+from analysis_store import AnalysisStore
+
+# Analysis status lives in SQLite rather than process memory, so a poll can land on
+# any worker (uvicorn --workers N); completed results live on disk
+analysis_store = AnalysisStore()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared analysis store for the lifetime of the worker"""
+    await analysis_store.open()
+    yield
+    await analysis_store.close()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Agentic Designer API",
     description="AI-powered design system extraction from website screenshots",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson serializes the large nested analysis results several times faster than json
+    default_response_class=ORJSONResponse
 )
 
+# Analysis JSON is highly compressible; level 1 keeps the CPU cost per response low.
+# Responses that already carry a Content-Encoding (the pre-gzipped download) pass through.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
 # Create directories
 Path("outputs/analyses").mkdir(parents=True, exist_ok=True)
 Path("outputs/screenshots").mkdir(parents=True, exist_ok=True)
@@ -33,6 +56,13 @@ Path("outputs/screenshots").mkdir(parents=True, exist_ok=True)
 # Global analyzer instance
 analyzer = VisionAnalyzer()
 
+# Config is read once at import, so validate it once too; /health reports the outcome
+try:
+    Config.validate()
+    _config_error: Optional[str] = None
+except Exception as e:
+    _config_error = str(e)
+
 # Pydantic models
 
 
@@ -43,24 +73,61 @@ class AnalysisRequest(BaseModel):
     multi_stage: bool = True
 
 
-class AnalysisResponse(BaseModel):
-    analysis_id: str
-    status: str
-    url: str
-    created_at: str
-    completed_at: Optional[str] = None
-    results: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
-
-
-# In-memory storage for analysis results (use database in production)
-analysis_storage: Dict[str, AnalysisResponse] = {}
-
-
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Simple web interface"""
-    return """
+# Finished records are pruned by age and count
+ANALYSIS_TTL_SECONDS = 3600
+MAX_STORED_ANALYSES = 1024
+# Records still processing after this long are failed (their worker likely stopped)
+STALE_ANALYSIS_SECONDS = 1800
+
+
+def _results_path(analysis_id: str, compressed: bool = False) -> Path:
+    """Path of an analysis' results file, or of its gzipped copy"""
+    return Path("outputs/analyses") / f"{analysis_id}.json{'.gz' if compressed else ''}"
+
+
+def _write_results(analysis_id: str, data: bytes):
+    """Write the results file plus a gzipped copy for clients that accept gzip"""
+    _results_path(analysis_id).write_bytes(data)
+    _results_path(analysis_id, compressed=True).write_bytes(gzip.compress(data, compresslevel=6))
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (q=0 means refused)"""
+    wildcard = False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        coding = coding.strip().lower()
+        if coding in ("gzip", "x-gzip"):
+            # An explicit entry overrides the wildcard
+            return quality > 0
+        if coding == "*":
+            wildcard = quality > 0
+    return wildcard
+
+
+def _status_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored analysis row as the status response"""
+    return {
+        "analysis_id": row["id"],
+        "status": row["status"],
+        "url": row["url"],
+        "created_at": row["created_at"],
+        "completed_at": row["completed_at"],
+        "results": None,
+        "error": row["error"]
+    }
+
+
+# Landing page, encoded once at import; GET / returns the same bytes every time
+_ROOT_HTML_BYTES = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -319,7 +386,14 @@ async def root():
         </script>
     </body>
     </html>
-    """
+    """.encode("utf-8")
+_ROOT_RESPONSE_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Simple web interface"""
+    return Response(content=_ROOT_HTML_BYTES, media_type="text/html", headers=_ROOT_RESPONSE_HEADERS)
 
 
 @app.post("/api/analyze")
@@ -330,14 +404,9 @@ async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundT
     analysis_id = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
 
     # Create analysis record
-    analysis_record = AnalysisResponse(
-        analysis_id=analysis_id,
-        status="processing",
-        url=str(request.url),
-        created_at=datetime.now().isoformat()
-    )
-
-    analysis_storage[analysis_id] = analysis_record
+    await analysis_store.prune(
+        ANALYSIS_TTL_SECONDS, MAX_STORED_ANALYSES, STALE_ANALYSIS_SECONDS)
+    await analysis_store.create(analysis_id, str(request.url), datetime.now().isoformat())
 
     # Start background analysis
     background_tasks.add_task(
@@ -356,36 +425,58 @@ async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundT
 async def get_analysis_status(analysis_id: str):
     """Get analysis status and results"""
 
-    if analysis_id not in analysis_storage:
+    analysis = await analysis_store.get(analysis_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    return analysis_storage[analysis_id]
+    # The stored record is already validated; skip FastAPI's re-encoding pass
+    record = _status_record(analysis)
+    if analysis["status"] == "completed":
+        # Completed results are kept on disk; splice the file's JSON into the response
+        # as-is instead of parsing and re-serializing megabytes on the event loop
+        try:
+            results_json = await asyncio.to_thread(_results_path(analysis_id).read_bytes)
+        except FileNotFoundError:
+            results_json = None
+        if results_json is not None:
+            del record["results"]
+            body = orjson.dumps(record)[:-1] + b',"results":' + results_json + b"}"
+            return Response(content=body, media_type="application/json")
+    return ORJSONResponse(record)
 
 
 @app.get("/api/analysis/{analysis_id}/download")
-async def download_analysis_results(analysis_id: str):
+async def download_analysis_results(analysis_id: str, request: Request):
     """Download analysis results as JSON file"""
 
-    if analysis_id not in analysis_storage:
+    analysis = await analysis_store.get(analysis_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    analysis = analysis_storage[analysis_id]
-
-    if analysis.status != "completed":
+    if analysis["status"] != "completed":
         raise HTTPException(status_code=400, detail="Analysis not completed")
 
-    # Create temporary file
-    results_file = Path("outputs/analyses") / f"{analysis_id}.json"
+    # run_analysis writes the file before marking the analysis completed
+    results_file = _results_path(analysis_id)
 
     if not results_file.exists():
-        # Create file from stored results
-        async with aiofiles.open(results_file, 'w') as f:
-            await f.write(json.dumps(analysis.results, indent=2))
+        raise HTTPException(status_code=500, detail="Analysis results file is missing")
+
+    # Serve the copy compressed once at write time; FileResponse sends either file as-is
+    gzip_file = _results_path(analysis_id, compressed=True)
+    if _accepts_gzip(request.headers.get("accept-encoding", "")) and gzip_file.exists():
+        return FileResponse(
+            path=gzip_file,
+            filename=f"design_analysis_{analysis_id}.json",
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
 
     return FileResponse(
         path=results_file,
         filename=f"design_analysis_{analysis_id}.json",
-        media_type="application/json"
+        media_type="application/json",
+        headers={"Vary": "Accept-Encoding"}
     )
 
 
@@ -415,32 +506,28 @@ async def run_analysis(
             "tool_version": "1.0.0"
         }
 
-        # Update storage
-        analysis_storage[analysis_id].status = "completed"
-        analysis_storage[analysis_id].completed_at = datetime.now().isoformat()
-        analysis_storage[analysis_id].results = results
+        # Save to file, plus its gzipped copy (one thread hop for all of it)
+        await asyncio.to_thread(
+            _write_results,
+            analysis_id,
+            orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
 
-        # Save to file
-        results_file = Path("outputs/analyses") / f"{analysis_id}.json"
-        async with aiofiles.open(results_file, 'w') as f:
-            await f.write(json.dumps(results, indent=2))
+        # Update storage; the results are served from the file, not kept in memory
+        await analysis_store.complete(analysis_id, str(_results_path(analysis_id)))
 
     except Exception as e:
         # Update storage with error
-        analysis_storage[analysis_id].status = "failed"
-        analysis_storage[analysis_id].error = str(e)
-        analysis_storage[analysis_id].completed_at = datetime.now().isoformat()
+        await analysis_store.fail(analysis_id, str(e))
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    try:
-        Config.validate()
-        return {"status": "healthy", "timestamp": datetime.now().isoformat()}
-    except Exception as e:
+    if _config_error is not None:
         raise HTTPException(
-            status_code=500, detail=f"Health check failed: {str(e)}")
+            status_code=500, detail=f"Health check failed: {_config_error}")
+    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 if __name__ == "__main__":
     import argparse
@@ -458,6 +545,8 @@ if __name__ == "__main__":
     print(f"📡 Server will be available at: http://{args.host}:{args.port}")
     print("💡 Make sure your OPENAI_API_KEY is set in environment variables or .env file")
 
+    # loop/http stay on "auto": uvicorn[standard] installs uvloop and httptools and
+    # uvicorn picks them up, falling back to asyncio/h11 where they're unavailable (Windows)
     uvicorn.run(
         "app:app",
         host=args.host,
@@ -4,23 +4,62 @@ Divides screenshots into scrollable sections and analyzes each component individ
 """
 
 import os
-import json
-from typing import Dict, List, Tuple, Any
+import base64
+import orjson
+from typing import Dict, List, Optional, Tuple, Any
 from PIL import Image
 import asyncio
 from datetime import datetime
+from openai import AsyncOpenAI
 
 from config import Config
 from screenshot_service import ScreenshotService
 from vision_analyzer import VisionAnalyzer
 
 
+# Per-segment React generation prompt; the analysis is embedded as compact JSON
+_REACT_PROMPT_TEMPLATE = """
+            Based on this component analysis, generate clean, modern React code:
+            
+            Analysis: {analysis_json}
+            
+            Requirements:
+            1. Use functional components with hooks
+            2. Include Tailwind CSS classes for styling
+            3. Make components responsive and accessible
+            4. Include proper TypeScript interfaces
+            5. Add hover states and interactions
+            6. Use semantic HTML elements
+            7. Include proper ARIA labels
+            
+            Generate complete, production-ready React component code that matches the analyzed design exactly.
+            Include all necessary imports and exports.
+            """
+
+
 class ComponentSegmenter:
     """Segments screenshots into components and analyzes each section"""
     
+    # Most per-segment OpenAI requests (vision analysis or code generation) in flight at once
+    MAX_CONCURRENT_SEGMENT_REQUESTS = 8
+    
     def __init__(self):
         self.config = Config()
         self.vision_analyzer = VisionAnalyzer()
+        self._client: Optional[AsyncOpenAI] = None
+        # Segments fan out with gather; cap the fan-out for long pages with many segments
+        self._segment_sem = asyncio.Semaphore(self.MAX_CONCURRENT_SEGMENT_REQUESTS)
+        
+    @property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client created on first use and shared by every code generation call"""
+        if self._client is None:
+            # Same retry budget as the A/B generator; the SDK backs off on 429/5xx
+            self._client = AsyncOpenAI(
+                api_key=self.config.OPENAI_API_KEY,
+                max_retries=self.config.OPENAI_MAX_RETRIES
+            )
+        return self._client
         
     async def segment_and_analyze(self, url: str) -> Dict[str, Any]:
         """
@@ -54,33 +93,43 @@ class ComponentSegmenter:
         """Capture 4 scroll segments of the webpage"""
         print("📸 Capturing scroll segments...")
         
-        segments = []
         scroll_positions = [0, 0.25, 0.5, 0.75]  # Top, Quarter, Half, Three-quarters
         
-        for i, scroll_pos in enumerate(scroll_positions):
-            segment_name = f"segment_{i+1}_{['top', 'quarter', 'half', 'bottom'][i]}"
-            
-            # Capture screenshot at specific scroll position
-            screenshot_path = await screenshot_service.capture_with_scroll(
-                url, scroll_position=scroll_pos, filename=f"{segment_name}.png"
-            )
-            
-            # Convert to base64 for analysis
-            with open(screenshot_path, "rb") as img_file:
-                import base64
-                base64_image = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            segments.append({
-                "segment_id": segment_name,
-                "scroll_position": scroll_pos,
-                "screenshot_path": screenshot_path,
-                "base64_image": base64_image,
-                "components": []  # Will be populated during analysis
-            })
-            
-            print(f"  📷 Captured {segment_name} at {scroll_pos*100}% scroll")
+        # Each capture opens its own page, so all positions load and scroll in parallel
+        segments = await asyncio.gather(*[
+            self._capture_segment(url, screenshot_service, i, scroll_pos)
+            for i, scroll_pos in enumerate(scroll_positions)
+        ])
+        
+        return list(segments)
+    
+    async def _capture_segment(
+        self,
+        url: str,
+        screenshot_service: ScreenshotService,
+        index: int,
+        scroll_pos: float
+    ) -> Dict[str, Any]:
+        """Capture and encode a single scroll segment"""
+        segment_name = f"segment_{index+1}_{['top', 'quarter', 'half', 'bottom'][index]}"
+        
+        # Capture screenshot at specific scroll position (saved to disk, bytes kept in memory)
+        screenshot_path, screenshot_bytes = await screenshot_service.capture_with_scroll(
+            url, scroll_position=scroll_pos, filename=f"{segment_name}.png", return_bytes=True
+        )
+        
+        # Convert to base64 for analysis straight from memory instead of re-reading the file
+        base64_image = base64.b64encode(screenshot_bytes).decode('ascii')
+        
+        print(f"  📷 Captured {segment_name} at {scroll_pos*100}% scroll")
         
-        return segments
+        return {
+            "segment_id": segment_name,
+            "scroll_position": scroll_pos,
+            "screenshot_path": screenshot_path,
+            "base64_image": base64_image,
+            "components": []  # Will be populated during analysis
+        }
     
     async def _analyze_segments(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze each segment to extract component information"""
@@ -130,11 +179,12 @@ class ComponentSegmenter:
         """
         
         # Analyze using vision analyzer with component-focused prompt
-        analysis = await self.vision_analyzer.analyze_screenshot(
-            segment["base64_image"], 
-            use_multi_stage=False,
-            custom_prompt=component_prompt
-        )
+        async with self._segment_sem:
+            analysis = await self.vision_analyzer.analyze_screenshot(
+                segment["base64_image"], 
+                use_multi_stage=False,
+                custom_prompt=component_prompt
+            )
         
         return {
             "segment_info": {
@@ -151,42 +201,39 @@ class ComponentSegmenter:
         
         react_components = {}
         
-        for segment_id, analysis in component_analyses.items():
-            print(f"  🔧 Generating React code for {segment_id}...")
-            
-            react_prompt = f"""
-            Based on this component analysis, generate clean, modern React code:
-            
-            Analysis: {json.dumps(analysis, indent=2)}
-            
-            Requirements:
-            1. Use functional components with hooks
-            2. Include Tailwind CSS classes for styling
-            3. Make components responsive and accessible
-            4. Include proper TypeScript interfaces
-            5. Add hover states and interactions
-            6. Use semantic HTML elements
-            7. Include proper ARIA labels
-            
-            Generate complete, production-ready React component code that matches the analyzed design exactly.
-            Include all necessary imports and exports.
-            """
-            
-            # Generate React code using GPT-4
-            react_code = await self._generate_code_with_gpt4(react_prompt)
-            react_components[segment_id] = react_code
-            
-            print(f"  ✅ Generated React code for {segment_id}")
+        # Segments are independent, so generate their code in parallel
+        segment_ids = list(component_analyses)
+        results = await asyncio.gather(
+            *[
+                self._generate_segment_react_code(segment_id, component_analyses[segment_id])
+                for segment_id in segment_ids
+            ],
+            return_exceptions=True
+        )
+        
+        for segment_id, result in zip(segment_ids, results):
+            if not isinstance(result, Exception):
+                react_components[segment_id] = result
+                print(f"  ✅ Generated React code for {segment_id}")
+            else:
+                print(f"  ❌ Failed to generate React code for {segment_id}: {result}")
         
         return react_components
     
-    async def _generate_code_with_gpt4(self, prompt: str) -> str:
-        """Generate code using GPT-4"""
-        from openai import AsyncOpenAI
+    async def _generate_segment_react_code(self, segment_id: str, analysis: Dict[str, Any]) -> str:
+        """Generate React code for a single analyzed segment"""
+        print(f"  🔧 Generating React code for {segment_id}...")
         
-        client = AsyncOpenAI(api_key=self.config.OPENAI_API_KEY)
+        react_prompt = _REACT_PROMPT_TEMPLATE.format(
+            analysis_json=orjson.dumps(analysis, option=orjson.OPT_NON_STR_KEYS).decode())
         
-        response = await client.chat.completions.create(
+        # Generate React code using GPT-4
+        async with self._segment_sem:
+            return await self._generate_code_with_gpt4(react_prompt)
+    
+    async def _generate_code_with_gpt4(self, prompt: str) -> str:
+        """Generate code using GPT-4"""
+        response = await self.client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {
@@ -263,13 +310,25 @@ class ComponentSegmenter:
     async def save_component_map(self, component_map: Dict[str, Any], output_dir: str = "components") -> str:
         """Save component map and associated files"""
         
+        # All directory creation and file writes happen in one worker-thread hop
+        map_file, react_dir = await asyncio.to_thread(
+            self._write_component_files, component_map, output_dir)
+        
+        print(f"💾 Component map saved to: {map_file}")
+        print(f"⚛️  React components saved to: {react_dir}")
+        
+        return map_file
+    
+    @staticmethod
+    def _write_component_files(component_map: Dict[str, Any], output_dir: str) -> Tuple[str, str]:
+        """Write the component map and React components; returns (map file, React directory)"""
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
         # Save main component map
         map_file = os.path.join(output_dir, "component_map.json")
-        with open(map_file, 'w') as f:
-            json.dump(component_map, f, indent=2)
+        with open(map_file, 'wb') as f:
+            f.write(orjson.dumps(component_map, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         # Save individual React components
         react_dir = os.path.join(output_dir, "react_components")
@@ -280,7 +339,4 @@ class ComponentSegmenter:
             with open(component_file, 'w') as f:
                 f.write(react_code)
         
-        print(f"💾 Component map saved to: {map_file}")
-        print(f"⚛️  React components saved to: {react_dir}")
-        
-        return map_file 
\ No newline at end of file
+        return map_file, react_dir 
\ No newline at end of file
@@ -6,6 +6,19 @@ load_dotenv()
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+    OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+    OPENAI_CHAT_STREAM = os.getenv("OPENAI_CHAT_STREAM", "false").lower() == "true"
+    OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "4"))
+    OPENAI_IMAGE_CONCURRENCY = int(os.getenv("OPENAI_IMAGE_CONCURRENCY", "3"))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+    OPENAI_RPM = int(os.getenv("OPENAI_RPM", "0"))
+    OPENAI_IMAGE_RPM = int(os.getenv("OPENAI_IMAGE_RPM", "0"))
+    COMPRESS_PACKAGES = os.getenv("COMPRESS_PACKAGES", "false").lower() == "true"
+    KEEP_UNCOMPRESSED_PACKAGES = os.getenv("KEEP_UNCOMPRESSED_PACKAGES", "false").lower() == "true"
+    CACHE_IMAGES = os.getenv("CACHE_IMAGES", "false").lower() == "true"
+    CACHE_CHAT_RESPONSES = os.getenv("CACHE_CHAT_RESPONSES", "false").lower() == "true"
+    CACHE_TTL_HOURS = float(os.getenv("CACHE_TTL_HOURS", "168"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
     SCREENSHOT_WIDTH = int(os.getenv("SCREENSHOT_WIDTH", "1920"))
     SCREENSHOT_HEIGHT = int(os.getenv("SCREENSHOT_HEIGHT", "1080"))
     SCREENSHOT_TIMEOUT = int(os.getenv("SCREENSHOT_TIMEOUT", "30000"))
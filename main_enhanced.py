@@ -31,7 +31,8 @@ class EnhancedAgentFlux:
         ab_pattern: Optional[str] = None,
         output_dir: str = "outputs",
         apply_styles: bool = False,
-        style_names: Optional[list] = None
+        style_names: Optional[list] = None,
+        include: Optional[set] = None
     ) -> dict:
         """
         Run the complete enhanced analysis workflow
@@ -42,6 +43,7 @@ class EnhancedAgentFlux:
             output_dir: Output directory for all results
             apply_styles: Whether to apply style presets to variations
             style_names: Optional list of specific style names to apply
+            include: Optional subset of variation outputs ("components", "react", "image")
 
         Returns:
             Complete analysis results
@@ -76,10 +78,15 @@ class EnhancedAgentFlux:
             print("• Generating variations with DALL-E...")
             print("• Running quality checks with GPT-4o...")
             print("• Applying improvements if needed...")
-            ab_test_package = await self.ab_generator.generate_ab_variations(
-                component_map,
-                ab_pattern
-            )
+            try:
+                ab_test_package = await self.ab_generator.generate_ab_variations(
+                    component_map,
+                    ab_pattern,
+                    include
+                )
+            finally:
+                # Release the generator's pooled OpenAI connections
+                await self.ab_generator.aclose()
 
             # Save A/B testing package
             ab_test_file = await self.ab_generator.save_ab_test_package(
@@ -105,18 +112,22 @@ class EnhancedAgentFlux:
                         apply_styles = False
 
                 if apply_styles:
-                    stylization_results = await self.stylizer.stylize_all_variations(
-                        ab_test_package,
-                        output_dir=os.path.join(
-                            output_dir, "stylized"),
-                        styles_to_apply=style_names
-                    )
-
-                    # Create style gallery
-                    gallery_path = os.path.join(
-                        output_dir, "stylized", "style_gallery.html")
-                    await self.stylizer.create_style_gallery(stylization_results, gallery_path)
-                    print(f"✅ Style gallery created: {gallery_path}")
+                    try:
+                        stylization_results = await self.stylizer.stylize_all_variations(
+                            ab_test_package,
+                            output_dir=os.path.join(
+                                output_dir, "stylized"),
+                            styles_to_apply=style_names
+                        )
+
+                        # Create style gallery
+                        gallery_path = os.path.join(
+                            output_dir, "stylized", "style_gallery.html")
+                        await self.stylizer.create_style_gallery(stylization_results, gallery_path)
+                        print(f"✅ Style gallery created: {gallery_path}")
+                    finally:
+                        # Release the stylizer's pooled download connections
+                        await self.stylizer.aclose()
 
             # Step 4: Generate Summary Report
             step_number = 4 if apply_styles else 3
@@ -319,6 +330,12 @@ Examples:
         help="Skip GPT-Image-1 image generation (faster, less cost)"
     )
 
+    parser.add_argument(
+        "--no-react",
+        action="store_true",
+        help="Skip React code generation for variations (faster, less cost)"
+    )
+
     parser.add_argument(
         "--stylize",
         action="store_true",
@@ -343,6 +360,13 @@ Examples:
         style_names = [s.strip() for s in args.styles.split(',')]
         print(f"📋 Selected styles: {', '.join(style_names)}")
 
+    # Variation outputs to generate; skipped ones are left out of the package
+    include = set(ABTestGenerator.VARIATION_OUTPUTS)
+    if args.no_images:
+        include.discard("image")
+    if args.no_react:
+        include.discard("react")
+
     # Initialize Enhanced AgentFlux
     enhanced_flux = EnhancedAgentFlux()
 
@@ -353,7 +377,8 @@ Examples:
             ab_pattern=args.ab_pattern,
             output_dir=args.output,
             apply_styles=args.stylize,
-            style_names=style_names
+            style_names=style_names,
+            include=include
         )
 
         print(f"\n✅ Analysis completed successfully!")
@@ -369,4 +394,10 @@ Examples:
 
 
 if __name__ == "__main__":
-    exit(asyncio.run(main()))
+    # uvloop speeds up the network fan-out; it's optional (no Windows support)
+    try:
+        import uvloop
+    except ImportError:
+        exit(asyncio.run(main()))
+    else:
+        exit(uvloop.run(main()))
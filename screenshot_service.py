@@ -2,7 +2,7 @@ import asyncio
 import base64
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, Union
 from PIL import Image
 from playwright.async_api import async_playwright, Browser, Page
 from config import Config
@@ -82,7 +82,7 @@ class ScreenshotService:
                     f.write(screenshot_bytes)
 
             # Convert to base64 for API
-            base64_image = base64.b64encode(screenshot_bytes).decode('utf-8')
+            base64_image = base64.b64encode(screenshot_bytes).decode('ascii')
             return base64_image
 
         except Exception as e:
@@ -95,8 +95,9 @@ class ScreenshotService:
         self,
         url: str,
         scroll_position: float = 0.0,
-        filename: Optional[str] = None
-    ) -> str:
+        filename: Optional[str] = None,
+        return_bytes: bool = False
+    ) -> Union[str, Tuple[str, bytes]]:
         """
         Capture a screenshot at a specific scroll position
 
@@ -104,9 +105,10 @@ class ScreenshotService:
             url: The website URL to capture
             scroll_position: Scroll position as percentage (0.0 = top, 1.0 = bottom)
             filename: Optional filename for saving
+            return_bytes: Also return the PNG bytes, sparing callers a read of the saved file
 
         Returns:
-            Path to saved screenshot file
+            Path to saved screenshot file, or (path, PNG bytes) if return_bytes is set
         """
         if not self.browser:
             raise RuntimeError("ScreenshotService not initialized.")
@@ -149,9 +151,11 @@ class ScreenshotService:
             output_path = Path("outputs/screenshots") / filename
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(output_path, 'wb') as f:
-                f.write(screenshot_bytes)
+            # Write off the event loop so sibling captures keep running
+            await asyncio.to_thread(output_path.write_bytes, screenshot_bytes)
 
+            if return_bytes:
+                return str(output_path), screenshot_bytes
             return str(output_path)
 
         except Exception as e:
@@ -188,7 +192,7 @@ class ScreenshotService:
                 type='png'
             )
             mobile_base64 = base64.b64encode(
-                mobile_screenshot_bytes).decode('utf-8')
+                mobile_screenshot_bytes).decode('ascii')
 
             return desktop_screenshot, mobile_base64
 
@@ -207,13 +211,15 @@ class ScreenshotService:
         Returns:
             Optimized base64 image
         """
+        # Check if optimization is needed; the decoded size follows from the base64 length,
+        # so images under the limit are never decoded
+        decoded_size = len(base64_image) * 3 // 4 - base64_image[-2:].count('=')
+        if decoded_size <= max_size:
+            return base64_image
+
         # Decode base64 image
         image_data = base64.b64decode(base64_image)
 
-        # Check if optimization is needed
-        if len(image_data) <= max_size:
-            return base64_image
-
         # Open image with PIL
         image = Image.open(BytesIO(image_data))
 
@@ -240,4 +246,4 @@ class ScreenshotService:
             resized_image.save(output_buffer, format='PNG', optimize=True)
 
         # Return optimized base64 image
-        return base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+        return base64.b64encode(output_buffer.getvalue()).decode('ascii')
@@ -156,4 +156,10 @@ Examples:
 
 
 if __name__ == "__main__":
-    exit(asyncio.run(main()))
+    # uvloop speeds up the network fan-out; it's optional (no Windows support)
+    try:
+        import uvloop
+    except ImportError:
+        exit(asyncio.run(main()))
+    else:
+        exit(uvloop.run(main()))
@@ -13,6 +13,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import replicate
 import aiohttp
+import aiofiles
+import orjson
 from PIL import Image
 import io
 from agentops.sdk.decorators import agent, tool
@@ -37,8 +39,33 @@ class VariationStylizer:
             raise ValueError(
                 "REPLICATE_API_TOKEN not found. Please provide token or set environment variable.")
 
+        # Shared HTTP session for downloading Replicate outputs (created lazily)
+        self._http: Optional[aiohttp.ClientSession] = None
+
         print("🎨 Initialized Variation Stylizer with Replicate")
 
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.aclose()
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+            )
+        return self._http
+
+    async def aclose(self):
+        """Close the shared HTTP session"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
     @tool
     async def stylize_all_variations(
         self,
@@ -134,8 +161,8 @@ class VariationStylizer:
 
         # Save stylization results
         results_file = os.path.join(output_dir, "stylization_results.json")
-        with open(results_file, 'w') as f:
-            json.dump(stylization_results, f, indent=2)
+        with open(results_file, 'wb') as f:
+            f.write(orjson.dumps(stylization_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
         print(f"\n✅ Stylization complete! Results saved to: {results_file}")
         self._display_stylization_summary(stylization_results)
@@ -256,73 +283,75 @@ class VariationStylizer:
             if output_url.startswith('http'):
                 # Download the image from the URL
                 print(f"      📥 Downloading from: {output_url}")
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(output_url) as response:
-                        if response.status != 200:
-                            raise ValueError(
-                                f"Failed to download: HTTP {response.status}")
-
-                        # Read and save the image
-                        content = await response.read()
-
-                        # EMERGENCY DEBUG
-                        print(f"      🚨 ATTEMPTING TO SAVE TO: {output_path}")
-                        print(
-                            f"      🚨 ABSOLUTE PATH: {os.path.abspath(output_path)}")
-                        print(
-                            f"      🚨 DIRECTORY EXISTS: {os.path.exists(os.path.dirname(output_path))}")
-                        print(f"      🚨 CWD: {os.getcwd()}")
-
-                        # Create directory if it doesn't exist
-                        os.makedirs(os.path.dirname(
-                            output_path), exist_ok=True)
-                        print(
-                            f"      🚨 CREATED DIR: {os.path.dirname(output_path)}")
-
-                        # Force overwrite by removing existing file first
-                        if os.path.exists(output_path):
-                            os.remove(output_path)
-                            print(f"      🗑️  Removed existing file")
-
-                        # Debug: Show exactly where we're writing
-                        print(
-                            f"      📝 Writing {len(content)} bytes to: {output_path}")
+                session = self._get_http_session()
+                async with session.get(output_url) as response:
+                    if response.status != 200:
+                        raise ValueError(
+                            f"Failed to download: HTTP {response.status}")
+
+                    # EMERGENCY DEBUG
+                    print(f"      🚨 ATTEMPTING TO SAVE TO: {output_path}")
+                    print(
+                        f"      🚨 ABSOLUTE PATH: {os.path.abspath(output_path)}")
+                    print(
+                        f"      🚨 DIRECTORY EXISTS: {os.path.exists(os.path.dirname(output_path))}")
+                    print(f"      🚨 CWD: {os.getcwd()}")
+
+                    # Create directory if it doesn't exist
+                    os.makedirs(os.path.dirname(
+                        output_path), exist_ok=True)
+                    print(
+                        f"      🚨 CREATED DIR: {os.path.dirname(output_path)}")
+
+                    # Force overwrite by removing existing file first
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                        print(f"      🗑️  Removed existing file")
+
+                    # Debug: Show exactly where we're writing
+                    print(
+                        f"      📝 Streaming {response.content_length or 'unknown'} bytes to: {output_path}")
+                    print(
+                        f"      📂 Current working directory: {os.getcwd()}")
+
+                    # Stream the image to disk, hashing it in the same pass
+                    file_hasher = hashlib.md5()
+                    bytes_written = 0
+                    async with aiofiles.open(output_path, "wb") as f:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            file_hasher.update(chunk)
+                            bytes_written += await f.write(chunk)
+                        await f.flush()  # Force write to disk
+                        # Force OS to write to disk
+                        await asyncio.to_thread(os.fsync, f.fileno())
+
+                    # EMERGENCY VERIFY
+                    print(
+                        f"      🚨 FILE EXISTS AFTER WRITE: {os.path.exists(output_path)}")
+                    print(
+                        f"      🚨 ABSOLUTE PATH CHECK: {os.path.exists(os.path.abspath(output_path))}")
+
+                    # List directory contents
+                    if os.path.exists(os.path.dirname(output_path)):
+                        files = os.listdir(os.path.dirname(output_path))
+                        print(f"      🚨 FILES IN DIR: {files}")
+
+                    # Verify file was written
+                    if os.path.exists(output_path):
+                        actual_size = os.path.getsize(output_path)
                         print(
-                            f"      📂 Current working directory: {os.getcwd()}")
-
-                        with open(output_path, "wb") as f:
-                            bytes_written = f.write(content)
-                            f.flush()  # Force write to disk
-                            os.fsync(f.fileno())  # Force OS to write to disk
-
-                        # EMERGENCY VERIFY
-                        print(
-                            f"      🚨 FILE EXISTS AFTER WRITE: {os.path.exists(output_path)}")
+                            f"      ✅ SAVED: {output_filename} ({actual_size} bytes)")
+                        print(f"         Full path: {abs_output_path}")
+                        print(f"         Bytes written: {bytes_written}")
                         print(
-                            f"      🚨 ABSOLUTE PATH CHECK: {os.path.exists(os.path.abspath(output_path))}")
-
-                        # List directory contents
-                        if os.path.exists(os.path.dirname(output_path)):
-                            files = os.listdir(os.path.dirname(output_path))
-                            print(f"      🚨 FILES IN DIR: {files}")
-
-                        # Verify file was written
-                        if os.path.exists(output_path):
-                            actual_size = os.path.getsize(output_path)
-                            print(
-                                f"      ✅ SAVED: {output_filename} ({actual_size} bytes)")
-                            print(f"         Full path: {abs_output_path}")
-                            print(f"         Bytes written: {bytes_written}")
-                            print(
-                                f"         File size matches: {actual_size == len(content)}")
-
-                            # Generate checksum for verification
-                            with open(output_path, 'rb') as f:
-                                file_hash = hashlib.md5(f.read()).hexdigest()
-                            print(f"         MD5: {file_hash}")
-                        else:
-                            raise ValueError(
-                                f"Failed to save file at {abs_output_path}")
+                            f"         File size matches: {actual_size == bytes_written}")
+
+                        # Checksum computed while streaming
+                        file_hash = file_hasher.hexdigest()
+                        print(f"         MD5: {file_hash}")
+                    else:
+                        raise ValueError(
+                            f"Failed to save file at {abs_output_path}")
             else:
                 raise ValueError(f"Expected URL but got: {output_url}")
 
@@ -527,23 +556,27 @@ async def stylize_from_ab_test_file(
         styles: Optional list of style names to apply
         create_gallery: Whether to create an HTML gallery
     """
-    # Load the A/B test package
-    with open(ab_test_file, 'r') as f:
-        ab_test_package = json.load(f)
+    # Load the A/B test package (zstd-compressed packages end in .zst)
+    if ab_test_file.endswith(".zst"):
+        import zstandard as zstd
+        with open(ab_test_file, 'rb') as f:
+            ab_test_package = json.loads(zstd.ZstdDecompressor().stream_reader(f).read())
+    else:
+        with open(ab_test_file, 'r') as f:
+            ab_test_package = json.load(f)
 
     # Initialize stylizer
-    stylizer = VariationStylizer()
-
-    # Apply styles
-    results = await stylizer.stylize_all_variations(
-        ab_test_package,
-        output_dir,
-        styles
-    )
-
-    # Create gallery if requested
-    if create_gallery:
-        gallery_path = os.path.join(output_dir, "style_gallery.html")
-        await stylizer.create_style_gallery(results, gallery_path)
+    async with VariationStylizer() as stylizer:
+        # Apply styles
+        results = await stylizer.stylize_all_variations(
+            ab_test_package,
+            output_dir,
+            styles
+        )
+
+        # Create gallery if requested
+        if create_gallery:
+            gallery_path = os.path.join(output_dir, "style_gallery.html")
+            await stylizer.create_style_gallery(results, gallery_path)
 
     return results
@@ -495,11 +495,11 @@ class VisionAnalyzer:
             if include_mobile:
                 desktop_screenshot, mobile_screenshot = await screenshot_service.capture_with_mobile_view(url)
 
-                # Optimize images
-                desktop_screenshot = ScreenshotService.optimize_image(
-                    desktop_screenshot)
-                mobile_screenshot = ScreenshotService.optimize_image(
-                    mobile_screenshot)
+                # Optimize images (re-encoding oversized ones is CPU work; keep it off the loop)
+                desktop_screenshot, mobile_screenshot = await asyncio.gather(
+                    asyncio.to_thread(ScreenshotService.optimize_image, desktop_screenshot),
+                    asyncio.to_thread(ScreenshotService.optimize_image, mobile_screenshot)
+                )
 
                 # Analyze both views
                 print("Analyzing desktop view...")
@@ -524,8 +524,8 @@ class VisionAnalyzer:
                     output_path=screenshot_path
                 )
 
-                # Optimize image
-                screenshot = ScreenshotService.optimize_image(screenshot)
+                # Optimize image (re-encoding an oversized one is CPU work; keep it off the loop)
+                screenshot = await asyncio.to_thread(ScreenshotService.optimize_image, screenshot)
 
                 # Analyze screenshot
                 print("Analyzing website design...")